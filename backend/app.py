@@ -1,25 +1,102 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context, g, has_request_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import os
+import multiprocessing
+import queue
+import threading
+import time
+import types
+import bisect
+import click
 import string
-import random
+import secrets
+import base64
+import hashlib
+import json
+import re
+import math
 from dotenv import load_dotenv
+import password_hashing
+from sqlalchemy import (update, insert, select, bindparam, func, event, create_engine, inspect,
+                        Select, TextualSelect, text, column)
+from sqlalchemy.engine import Engine
+import numpy as np
+from sqlalchemy.exc import IntegrityError, OperationalError
 
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
+CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}}, expose_headers=["X-Next-Cursor"])
 
 # Configure SQLite database
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///environmental_program.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///environmental_program.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = 'your_secret_key'  # Change this to a random secret key
-db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
+# Password hashing: bcrypt work factor, hashing process pool size (0 hashes inline)
+# and how long an unknown username is remembered before hitting the DB again; the
+# shared account version is re-read this often to drop misses for new registrations
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+app.config['PASSWORD_POOL_SIZE'] = int(os.getenv('PASSWORD_POOL_SIZE', os.cpu_count() or 1))
+app.config['UNKNOWN_USER_CACHE_SIZE'] = int(os.getenv('UNKNOWN_USER_CACHE_SIZE', 10000))
+app.config['UNKNOWN_USER_CACHE_TTL'] = float(os.getenv('UNKNOWN_USER_CACHE_TTL', 30))
+app.config['ACCOUNT_VERSION_CHECK_INTERVAL'] = float(os.getenv('ACCOUNT_VERSION_CHECK_INTERVAL', 1.0))
+# Opt-in SQLite concurrency mode: WAL, tuned pragmas, separate read/write pools
+# and a group-commit writer thread for small inserts
+app.config['SQLITE_CONCURRENCY_MODE'] = os.getenv('SQLITE_CONCURRENCY_MODE', '0') == '1'
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+app.config['SQLITE_READ_POOL_SIZE'] = int(os.getenv('SQLITE_READ_POOL_SIZE', 10))
+app.config['GROUP_COMMIT_WINDOW_MS'] = float(os.getenv('GROUP_COMMIT_WINDOW_MS', 2))
+app.config['GROUP_COMMIT_MAX_BATCH'] = int(os.getenv('GROUP_COMMIT_MAX_BATCH', 256))
+# Catalog read cache: memory bound and entry cap for cached views and how often the
+# shared catalog version is re-read to pick up writes made by other worker processes
+app.config['CATALOG_CACHE_MAX_BYTES'] = int(os.getenv('CATALOG_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+app.config['CATALOG_CACHE_MAX_ENTRIES'] = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', 10000))
+app.config['CATALOG_VERSION_CHECK_INTERVAL'] = float(os.getenv('CATALOG_VERSION_CHECK_INTERVAL', 1.0))
+# Eco score engine: optional JSON file overriding the default weights, memo size
+# and how many products the bulk re-score reads and writes per transaction
+app.config['ECO_SCORE_WEIGHTS_FILE'] = os.getenv('ECO_SCORE_WEIGHTS_FILE')
+app.config['ECO_SCORE_MEMO_SIZE'] = int(os.getenv('ECO_SCORE_MEMO_SIZE', 100000))
+app.config['ECO_SCORE_CHUNK_SIZE'] = int(os.getenv('ECO_SCORE_CHUNK_SIZE', 5000))
+# Leaderboard: how many users are served, and how often the in-memory top-K is
+# reloaded to pick up eco points earned through other worker processes
+app.config['LEADERBOARD_SIZE'] = int(os.getenv('LEADERBOARD_SIZE', 100))
+app.config['LEADERBOARD_REFRESH_INTERVAL'] = float(os.getenv('LEADERBOARD_REFRESH_INTERVAL', 30))
+
+_read_engine = None
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """Send plain and textual SELECTs to the read pool while a transaction hasn't written yet.
+
+    Flushes, DML and anything after the first write use the default (writer) engine
+    so a transaction always reads its own changes. Without concurrency mode every
+    statement uses the default engine as before.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _read_engine is not None:
+            if (isinstance(clause, (Select, TextualSelect)) and not self._flushing
+                    and not self.info.get('wrote') and not self.info.get('pin_writer')):
+                return _read_engine
+            self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_write_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('wrote', None)
+
+
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 jwt = JWTManager(app)
 
 # Define User model
@@ -30,9 +107,27 @@ class User(db.Model):
     role = db.Column(db.String(50), default='customer')  # Default role is 'customer'
     eco_points = db.Column(db.Integer, default=0)  # Add eco_points field with default value 0
 
+    # Lets the leaderboard read the top balances without sorting the table
+    __table_args__ = (
+        db.Index('ix_user_eco_points', 'eco_points'),
+    )
+
     def __repr__(self):
         return f'<User {self.username}>'
 
+# Append-only history of eco point changes; User.eco_points is its running total
+class EcoPointsLedger(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    delta = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(50), nullable=False)  # recycle_approval, redemption, ...
+    reference_id = db.Column(db.Integer, nullable=True)  # Recycle item or voucher id
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_eco_points_ledger_user_id_id', 'user_id', 'id'),
+    )
+
 
 # Define Product model
 class Product(db.Model):
@@ -42,10 +137,42 @@ class Product(db.Model):
     price = db.Column(db.Float, nullable=False)
     eco_score = db.Column(db.Integer, nullable=True)  # Eco score can be added later
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Sustainability attributes the eco score engine scores
+    material = db.Column(db.String(150), nullable=True)
+    certifications = db.Column(db.String(300), nullable=True)
+    manufacturing_location = db.Column(db.String(150), nullable=True)
+    durability = db.Column(db.String(150), nullable=True)
+    end_of_life = db.Column(db.String(150), nullable=True)
+    # Seller's list price; dynamic pricing derives ``price`` from it
+    base_price = db.Column(db.Float, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_product_user_id_id', 'user_id', 'id'),
+    )
 
     def __repr__(self):
         return f'<Product {self.name}>'
 
+# Define PricingRule model (one per seller)
+class PricingRule(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, nullable=False)
+    min_price = db.Column(db.Float, nullable=False)
+    max_price = db.Column(db.Float, nullable=False)
+    eco_premium = db.Column(db.Float, nullable=False, default=0.1)  # Uplift at eco_score 100
+    demand_sensitivity = db.Column(db.Float, nullable=False, default=0.2)  # Uplift at demand 1.0
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Single-row counter bumped in every transaction that changes the catalog
+class CatalogVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Single-row counter bumped in every transaction that registers a user or admin
+class AccountVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 # Define RecycleItem model
 class RecycleItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -55,7 +182,14 @@ class RecycleItem(db.Model):
     description = db.Column(db.String(300), nullable=True)
     status = db.Column(db.String(50), default="Pending")
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    date_submitted = db.Column(db.DateTime, default=db.func.current_timestamp())
+    # Python-side default keeps the stored format identical to bound cursor values
+    date_submitted = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Composite indexes matching the keyset orderings used by the list endpoints
+    __table_args__ = (
+        db.Index('ix_recycle_item_status_date_id', 'status', 'date_submitted', 'id'),
+        db.Index('ix_recycle_item_user_id_id', 'user_id', 'id'),
+    )
 
 # Define Voucher model
 class Voucher(db.Model):
@@ -66,6 +200,10 @@ class Voucher(db.Model):
     valid_until = db.Column(db.DateTime, nullable=False)
     is_redeemed = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (
+        db.Index('ix_voucher_user_id_redeemed_id', 'user_id', 'is_redeemed', 'id'),
+    )
+
 
 # Define Admin model
 class Admin(db.Model):
@@ -73,14 +211,1191 @@ class Admin(db.Model):
     username = db.Column(db.String(150), unique=True, nullable=False)
     password = db.Column(db.String(150), nullable=False)
 
+# Analytics rollups, maintained by triggers as rows are written (see ANALYTICS_TRIGGERS)
+class RecycleDailyRollup(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    material = db.Column(db.String(150), primary_key=True)  # Lower-cased
+    status = db.Column(db.String(50), primary_key=True)  # Submitted, Approved or Rejected
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+class VoucherDailyRollup(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    issued = db.Column(db.Integer, nullable=False, default=0)
+    redeemed = db.Column(db.Integer, nullable=False, default=0)
+
+class ProductEcoScoreBand(db.Model):
+    band = db.Column(db.Integer, primary_key=True, autoincrement=False)  # See ECO_BAND_SQL
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only=False):
+    cursor = dbapi_connection.cursor()
+    # Set first so switching an existing database to WAL waits for other workers' locks
+    cursor.execute(f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT_MS']}")
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f"PRAGMA mmap_size={app.config['SQLITE_MMAP_SIZE']}")
+    if read_only:
+        cursor.execute('PRAGMA query_only=1')
+    cursor.close()
+
+
+def configure_sqlite_engines():
+    """Install the concurrency-mode connect hooks and create the read pool."""
+    global _read_engine
+    writer = db.engine
+
+    @event.listens_for(writer, 'connect')
+    def _on_writer_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy issue BEGIN itself so savepoints work and writers
+        # take the lock up front instead of failing a read-to-write upgrade
+        dbapi_connection.isolation_level = None
+        _apply_sqlite_pragmas(dbapi_connection)
+
+    @event.listens_for(writer, 'begin')
+    def _on_writer_begin(connection):
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+    _read_engine = create_engine(writer.url, pool_size=app.config['SQLITE_READ_POOL_SIZE'],
+                                 max_overflow=0)
+
+    @event.listens_for(_read_engine, 'connect')
+    def _on_reader_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, read_only=True)
+
+# Full-text index over product name/description, kept in sync by triggers so
+# bulk UPDATEs that bypass the ORM are indexed too
+PRODUCT_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE product_fts USING fts5(
+        name, description, content='product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS product_fts_au AFTER UPDATE OF name, description ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO product_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+product_search_enabled = False
+
+
+def create_product_search_index():
+    """Create the FTS5 index and its triggers, backfilling existing products once."""
+    global product_search_enabled
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.begin() as connection:
+        # Locked so only one of several starting workers creates and fills the index
+        begin_immediate(connection)
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'product_fts'").first()
+        try:
+            if not exists:
+                connection.exec_driver_sql(PRODUCT_SEARCH_DDL[0])
+                connection.exec_driver_sql(
+                    "INSERT INTO product_fts(product_fts) VALUES ('rebuild')")
+            for statement in PRODUCT_SEARCH_DDL[1:]:
+                connection.exec_driver_sql(statement)
+        except OperationalError as exc:
+            if 'fts5' not in str(exc):
+                raise
+            app.logger.warning('SQLite was built without FTS5; product search is disabled')
+            return
+    product_search_enabled = True
+
+def add_missing_columns(connection):
+    # create_all never alters existing tables, so add nullable columns introduced later.
+    # Inspect on the migration connection; a second one would wait on its write lock
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col['name'] for col in inspector.get_columns(table.name)}
+        for col in table.columns:
+            if col.name not in existing and col.nullable:
+                col_type = col.type.compile(dialect=db.engine.dialect)
+                connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{col.name}" {col_type}')
+
+# eco_score // 20 with 80-100 in band 4 and unscored products in band -1
+ECO_BAND_SQL = ("CASE WHEN {0}.eco_score IS NULL THEN -1 WHEN {0}.eco_score >= 80 THEN 4 "
+                "WHEN {0}.eco_score < 0 THEN 0 ELSE {0}.eco_score / 20 END")
+ANALYTICS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS recycle_rollup_ai AFTER INSERT ON recycle_item BEGIN
+        INSERT INTO recycle_daily_rollup (day, material, status, total)
+        VALUES (date(new.date_submitted), lower(trim(new.material)), 'Submitted', 1)
+        ON CONFLICT (day, material, status) DO UPDATE SET total = total + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS recycle_rollup_au AFTER UPDATE OF status ON recycle_item
+    WHEN new.status IS NOT old.status AND new.status IN ('Approved', 'Rejected') BEGIN
+        INSERT INTO recycle_daily_rollup (day, material, status, total)
+        VALUES (date('now'), lower(trim(new.material)), new.status, 1)
+        ON CONFLICT (day, material, status) DO UPDATE SET total = total + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS voucher_rollup_ai AFTER INSERT ON voucher BEGIN
+        INSERT INTO voucher_daily_rollup (day, issued, redeemed) VALUES (date('now'), 1, 0)
+        ON CONFLICT (day) DO UPDATE SET issued = issued + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS voucher_rollup_au AFTER UPDATE OF is_redeemed ON voucher
+    WHEN new.is_redeemed AND NOT COALESCE(old.is_redeemed, 0) BEGIN
+        INSERT INTO voucher_daily_rollup (day, issued, redeemed) VALUES (date('now'), 0, 1)
+        ON CONFLICT (day) DO UPDATE SET redeemed = redeemed + 1;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_band_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_eco_score_band (band, total) VALUES ({ECO_BAND_SQL.format('new')}, 1)
+        ON CONFLICT (band) DO UPDATE SET total = total + 1;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_band_ad AFTER DELETE ON product BEGIN
+        UPDATE product_eco_score_band SET total = total - 1 WHERE band = {ECO_BAND_SQL.format('old')};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_band_au AFTER UPDATE OF eco_score ON product
+    WHEN {ECO_BAND_SQL.format('new')} != {ECO_BAND_SQL.format('old')} BEGIN
+        UPDATE product_eco_score_band SET total = total - 1 WHERE band = {ECO_BAND_SQL.format('old')};
+        INSERT INTO product_eco_score_band (band, total) VALUES ({ECO_BAND_SQL.format('new')}, 1)
+        ON CONFLICT (band) DO UPDATE SET total = total + 1;
+    END""",
+]
+# One-off backfill from existing rows, run in the transaction that installs the triggers.
+# Decision and issue days aren't recorded, so submission day and valid_until - 30 days stand in.
+# ("WHERE true" keeps SQLite from parsing ON CONFLICT as a join constraint.)
+ANALYTICS_BACKFILL = [
+    """INSERT INTO recycle_daily_rollup (day, material, status, total)
+    SELECT date(date_submitted), lower(trim(material)), 'Submitted', COUNT(*) FROM recycle_item
+    WHERE true GROUP BY 1, 2
+    ON CONFLICT DO NOTHING""",
+    """INSERT INTO recycle_daily_rollup (day, material, status, total)
+    SELECT date(date_submitted), lower(trim(material)), status, COUNT(*) FROM recycle_item
+    WHERE status IN ('Approved', 'Rejected') GROUP BY 1, 2, 3
+    ON CONFLICT DO NOTHING""",
+    """INSERT INTO voucher_daily_rollup (day, issued, redeemed)
+    SELECT date(valid_until, '-30 days'), COUNT(*), SUM(CASE WHEN is_redeemed THEN 1 ELSE 0 END)
+    FROM voucher WHERE true GROUP BY 1
+    ON CONFLICT DO NOTHING""",
+    f"""INSERT INTO product_eco_score_band (band, total)
+    SELECT {ECO_BAND_SQL.format('product')}, COUNT(*) FROM product WHERE true GROUP BY 1
+    ON CONFLICT DO NOTHING""",
+]
+ANALYTICS_ROLLUP_TABLES = ['recycle_daily_rollup', 'voucher_daily_rollup', 'product_eco_score_band']
+
+
+def begin_immediate(connection):
+    # Take the write lock now; concurrency mode's writer engine already does on begin
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def create_analytics_triggers():
+    """Backfill the rollups and install their triggers, once per database.
+
+    The check and the work share one write-locked transaction, so when several
+    workers start together exactly one of them backfills; the triggers
+    themselves are the marker that it happened.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.begin() as connection:
+        begin_immediate(connection)
+        installed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'recycle_rollup_ai'").first()
+        if installed:
+            return
+        for statement in ANALYTICS_BACKFILL:
+            connection.exec_driver_sql(statement)
+        for statement in ANALYTICS_TRIGGERS:
+            connection.exec_driver_sql(statement)
+
+
+def rebuild_analytics_rollups():
+    # Recount every rollup from the source tables while holding the write lock
+    with db.engine.begin() as connection:
+        begin_immediate(connection)
+        for table in ANALYTICS_ROLLUP_TABLES:
+            connection.exec_driver_sql(f'DELETE FROM {table}')
+        for statement in ANALYTICS_BACKFILL:
+            connection.exec_driver_sql(statement)
+
+
+@app.cli.command('rebuild-analytics')
+def rebuild_analytics_command():
+    """Recompute the analytics rollups from existing rows (repairs a missed backfill)."""
+    rebuild_analytics_rollups()
+    print('analytics rollups rebuilt')
+
+def normalize_recycle_dates(connection):
+    # Rows written by the old CURRENT_TIMESTAMP default lack microseconds and would
+    # sort before the bound cursor values of the same second, so keyset pages skip them
+    if db.engine.dialect.name != 'sqlite':
+        return
+    connection.exec_driver_sql(
+        "UPDATE recycle_item SET date_submitted = date_submitted || '.000000' "
+        "WHERE length(date_submitted) = 19")
+
 # Create tables if not already created
 with app.app_context():
-    db.create_all()
+    if app.config['SQLITE_CONCURRENCY_MODE'] and db.engine.dialect.name == 'sqlite':
+        configure_sqlite_engines()
+    # Every schema step checks what exists and then changes it, so workers starting
+    # together take turns through one write-locked transaction
+    with db.engine.begin() as connection:
+        if db.engine.dialect.name == 'sqlite':
+            begin_immediate(connection)
+        ledger_is_new = not inspect(connection).has_table(EcoPointsLedger.__tablename__)
+        db.metadata.create_all(connection)
+        add_missing_columns(connection)
+        normalize_recycle_dates(connection)
+        if ledger_is_new:
+            # Carry existing balances into the ledger so reconciliation doesn't zero them
+            connection.execute(text("""
+                INSERT INTO eco_points_ledger (user_id, delta, reason, created_at)
+                SELECT id, eco_points, 'opening_balance', :now FROM user
+                WHERE COALESCE(eco_points, 0) != 0
+                  AND NOT EXISTS (SELECT 1 FROM eco_points_ledger WHERE reason = 'opening_balance')
+            """), {'now': datetime.utcnow()})
+        # create_all skips tables that already exist, so add any new indexes explicitly
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+    for counter in (CatalogVersion, AccountVersion):
+        if counter.query.get(1) is None:
+            db.session.add(counter(id=1, version=0))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()  # Another worker created it first
+    create_product_search_index()
+    create_analytics_triggers()
+
+# ---------------- Pagination Helpers ----------------
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(values):
+    # Opaque cursor holding the sort key of the last row on a page
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor_value(value, column_type):
+    # Cursors come from the client, so each value must match its column before it reaches SQL
+    if isinstance(column_type, db.DateTime):
+        if not isinstance(value, str):
+            raise TypeError('cursor value is not a timestamp')
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, db.Integer):
+        expected = (int,)
+    elif isinstance(column_type, db.Float):
+        expected = (int, float)
+    else:
+        expected = (str,)
+    if isinstance(value, bool) or not isinstance(value, expected):
+        raise TypeError('cursor value has the wrong type')
+    return value
+
+
+def decode_cursor(cursor, order_columns):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(order_columns):
+            raise ValueError('cursor length mismatch')
+        return [decode_cursor_value(v, col.type) for v, col in zip(values, order_columns)]
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def keyset_page(query, order_columns, after, limit):
+    # Seek past the last seen key instead of using OFFSET, so every page is an index range scan
+    if after is not None:
+        query = query.filter(db.tuple_(*order_columns) > db.tuple_(*after))
+    return query.order_by(*order_columns).limit(limit).all()
+
+
+def paginated_response(query, order_columns, serialize):
+    """Return one keyset page as a JSON list, or the whole result as streamed NDJSON.
+
+    Query parameters: ``limit`` (page size), ``cursor`` (from the ``X-Next-Cursor``
+    header of the previous page) and ``format=ndjson`` to stream every row.
+    """
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        after = decode_cursor(cursor, order_columns)
+        if after is None:
+            return jsonify({"message": "Invalid cursor!"}), 400
+
+    key_names = [col.key for col in order_columns]
+
+    if request.args.get('format') == 'ndjson':
+        def generate(after):
+            while True:
+                rows = keyset_page(query, order_columns, after, STREAM_BATCH_SIZE)
+                for row in rows:
+                    yield app.json.dumps(serialize(row)) + '\n'
+                if len(rows) < STREAM_BATCH_SIZE:
+                    break
+                after = [getattr(rows[-1], name) for name in key_names]
+                # Drop the batch from the identity map so memory stays flat
+                db.session.expunge_all()
+
+        return Response(stream_with_context(generate(after)), mimetype='application/x-ndjson')
+
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = keyset_page(query, order_columns, after, limit + 1)
+
+    response = jsonify([serialize(row) for row in rows[:limit]])
+    if len(rows) > limit:
+        response.headers['X-Next-Cursor'] = encode_cursor(
+            [getattr(rows[limit - 1], name) for name in key_names])
+    return response, 200
 
 @app.route('/')
 def home():
     return "Welcome to Green Street Market!"
 
+# ---------------- Group Commit ----------------
+
+class GroupCommitWriter:
+    """Single background thread that commits queued write jobs in batches.
+
+    Jobs arriving within ``GROUP_COMMIT_WINDOW_MS`` of the first one share a
+    transaction, each inside its own savepoint so a failing job doesn't abort
+    the rest, and are committed together.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn):
+        future = Future()
+        with self._lock:
+            # Started lazily so each gunicorn worker gets its own writer after fork
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='group-commit-writer',
+                                                daemon=True)
+                self._thread.start()
+        self._queue.put((fn, future))
+        return future
+
+    def _run(self):
+        with app.app_context():
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + app.config['GROUP_COMMIT_WINDOW_MS'] / 1000
+                while len(batch) < app.config['GROUP_COMMIT_MAX_BATCH']:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        db.session.info['pin_writer'] = True
+        outcomes = []
+        try:
+            for fn, future in batch:
+                try:
+                    with db.session.begin_nested():
+                        outcomes.append((future, fn(), None))
+                except Exception as exc:
+                    outcomes.append((future, None, exc))
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            outcomes = [(future, None, exc) for _, future in batch]
+        finally:
+            db.session.remove()
+
+        for future, result, exc in outcomes:
+            if exc is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exc)
+
+
+group_commit_writer = GroupCommitWriter()
+
+
+def run_write(fn):
+    """Run ``fn`` (which stages changes on ``db.session``) and commit, returning its result.
+
+    In concurrency mode the job runs on the group-commit writer and this blocks until
+    the batch containing it has committed.
+    """
+    if app.config['SQLITE_CONCURRENCY_MODE']:
+        return group_commit_writer.submit(fn).result()
+    try:
+        result = fn()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
+
+# ---------------- Request Metrics ----------------
+# Per-process latency histograms per route, plus DB query count and time per request.
+LATENCY_BUCKETS_MS = [0.1 * 1.25 ** i for i in range(60)]  # 0.1ms up to ~65s
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.requests = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_queries = 0
+        self.db_ms = 0.0
+
+    def record(self, elapsed_ms, db_queries, db_ms):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.db_queries += db_queries
+        self.db_ms += db_ms
+
+    def percentile(self, pct):
+        # Upper bound of the bucket holding the pct-th request
+        target = math.ceil(pct / 100 * self.requests)
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(LATENCY_BUCKETS_MS[index], self.max_ms) if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            'requests': self.requests,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'mean_ms': round(self.total_ms / self.requests, 3),
+            'max_ms': round(self.max_ms, 3),
+            'db_queries_per_request': round(self.db_queries / self.requests, 2),
+            'db_ms_per_request': round(self.db_ms / self.requests, 3),
+        }
+
+
+route_metrics = {}
+route_metrics_lock = threading.Lock()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('query_started', time.perf_counter())
+    if has_request_context() and 'request_started' in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+
+def _current_route():
+    return f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+
+
+def _record_request(route, request_g):
+    # Popping the start time makes sure each request is recorded once
+    started = request_g.pop('request_started', None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with route_metrics_lock:
+        metrics = route_metrics.get(route)
+        if metrics is None:
+            metrics = route_metrics[route] = RouteMetrics()
+        metrics.record(elapsed_ms, request_g.db_queries, request_g.db_seconds * 1000)
+
+
+@app.after_request
+def _defer_streamed_request_metrics(response):
+    # teardown_request fires when the view returns and again when a stream_with_context
+    # generator finishes, so generated bodies are recorded once they have been sent
+    if isinstance(response.response, types.GeneratorType) and 'request_started' in g:
+        g.metrics_deferred = True
+        route, request_g = _current_route(), g._get_current_object()
+        response.call_on_close(lambda: _record_request(route, request_g))
+    return response
+
+
+@app.teardown_request
+def _record_request_metrics(exc):
+    if 'request_started' in g and not g.get('metrics_deferred'):
+        _record_request(_current_route(), g)
+
+# ---------------- Metrics Routes ----------------
+# Per-route latency percentiles and DB usage for this worker process
+@app.route('/api/admin/metrics', methods=['GET'])
+@jwt_required()
+def get_metrics():
+    current_user = get_jwt_identity()
+    if current_user.get('role') != 'admin':
+        return jsonify({"message": "Unauthorized"}), 403
+    with route_metrics_lock:
+        routes = {route: metrics.snapshot() for route, metrics in route_metrics.items()}
+    return jsonify({
+        'pid': os.getpid(),
+        'routes': routes
+    }), 200
+
+# ---------------- Password Hashing ----------------
+# bcrypt is CPU bound, so hashes are computed in a bounded process pool and the
+# request thread only waits on the result instead of holding the GIL.
+# Pool processes are started with forkserver (spawn where unavailable), never by
+# forking a multi-threaded worker, and only import the password_hashing module.
+PASSWORD_POOL_START_METHOD = ('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods()
+                              else 'spawn')
+
+_password_pool = None
+_password_pool_lock = threading.Lock()
+_dummy_hashes = {}
+
+
+def get_password_pool():
+    # Created lazily so gunicorn workers each start their own pool after startup
+    global _password_pool
+    if app.config['PASSWORD_POOL_SIZE'] <= 0:
+        return None
+    with _password_pool_lock:
+        if _password_pool is None:
+            _password_pool = ProcessPoolExecutor(
+                max_workers=app.config['PASSWORD_POOL_SIZE'],
+                mp_context=multiprocessing.get_context(PASSWORD_POOL_START_METHOD))
+        return _password_pool
+
+
+def discard_password_pool(pool):
+    # A pool whose process died is unusable; drop it so the next task starts a new one
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is pool:
+            _password_pool = None
+    pool.shutdown(wait=False)
+
+
+def configure_password_pool(size):
+    # Replace the hashing pool, e.g. when benchmarking different pool sizes
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown()
+            _password_pool = None
+        app.config['PASSWORD_POOL_SIZE'] = size
+
+
+def _run_password_task(fn, *args):
+    pool = get_password_pool()
+    if pool is None:
+        return fn(*args)
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        discard_password_pool(pool)
+        return get_password_pool().submit(fn, *args).result()
+
+
+def hash_password(password):
+    return _run_password_task(password_hashing.hash_password, password, app.config['BCRYPT_LOG_ROUNDS'])
+
+
+def check_password(pw_hash, password):
+    return _run_password_task(password_hashing.check_password, pw_hash, password)
+
+
+def password_needs_rehash(pw_hash):
+    # bcrypt hashes look like $2b$<rounds>$<salt+hash>
+    try:
+        return int(pw_hash.split('$')[2]) != app.config['BCRYPT_LOG_ROUNDS']
+    except (IndexError, ValueError):
+        return True
+
+
+def dummy_password_check(password):
+    # Burn the same bcrypt cost as a real check so unknown usernames can't be timed
+    rounds = app.config['BCRYPT_LOG_ROUNDS']
+    if rounds not in _dummy_hashes:
+        _dummy_hashes[rounds] = password_hashing.hash_password('dummy-password', rounds)
+    check_password(_dummy_hashes[rounds], password)
+    return False
+
+
+class UnknownUsernameCache:
+    """Per-process LRU of usernames recently found not to exist.
+
+    Entries expire after ``UNKNOWN_USER_CACHE_TTL`` seconds. Registration in any
+    worker bumps ``AccountVersion``; when a worker sees a new version (re-read at
+    most once per ``ACCOUNT_VERSION_CHECK_INTERVAL``) it drops every cached miss.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _sync_version(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < app.config['ACCOUNT_VERSION_CHECK_INTERVAL']:
+            return
+        version = db.session.query(AccountVersion.version).filter_by(id=1).scalar() or 0
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+
+    def __contains__(self, key):
+        self._sync_version()
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, key):
+        self._sync_version()
+        with self._lock:
+            self._entries[key] = time.monotonic() + app.config['UNKNOWN_USER_CACHE_TTL']
+            self._entries.move_to_end(key)
+            while len(self._entries) > app.config['UNKNOWN_USER_CACHE_SIZE']:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+unknown_usernames = UnknownUsernameCache()
+
+
+def bump_account_version():
+    # Part of the registering transaction, so other workers only drop misses once it commits
+    db.session.execute(update(AccountVersion).where(AccountVersion.id == 1)
+                       .values(version=AccountVersion.version + 1))
+
+
+def authenticate(model, username, password):
+    """Return the matching ``User``/``Admin`` row or None, rehashing on a cost change."""
+    if not username or not password:
+        return None
+
+    cache_key = (model.__tablename__, username)
+    if cache_key in unknown_usernames:
+        return dummy_password_check(password) or None
+
+    account = model.query.filter_by(username=username).first()
+    if account is None:
+        unknown_usernames.add(cache_key)
+        return dummy_password_check(password) or None
+
+    if not check_password(account.password, password):
+        return None
+
+    if password_needs_rehash(account.password):
+        account.password = hash_password(password)
+        db.session.commit()
+    return account
+
+# ---------------- Catalog Cache ----------------
+# Approximate memory held per cached view besides its body: key, ETag string,
+# entry tuple and the OrderedDict node
+CATALOG_CACHE_ENTRY_OVERHEAD = 512
+
+
+class CatalogCache:
+    """Serialized catalog views keyed by view and catalog version.
+
+    Bodies are stored pre-serialized with a strong ETag so a repeat request can be
+    answered with 304 (or the cached bytes) without touching the database. Views
+    are evicted least-recently-used once their bodies plus a fixed per-entry
+    overhead exceed ``CATALOG_CACHE_MAX_BYTES``, or there are more than
+    ``CATALOG_CACHE_MAX_ENTRIES`` of them.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()  # view key -> (version, etag, body)
+        self._size = 0
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.not_modified = self.evictions = 0
+
+    def current_version(self):
+        # The version lives in the DB so writes from any worker invalidate every cache;
+        # it is re-read at most once per CATALOG_VERSION_CHECK_INTERVAL
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= app.config['CATALOG_VERSION_CHECK_INTERVAL']:
+            self._version = db.session.query(CatalogVersion.version).filter_by(id=1).scalar() or 0
+            self._checked_at = now
+        return self._version
+
+    def invalidate(self):
+        # Called after a local write commits so the next read sees the new version
+        with self._lock:
+            self._version = None
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    @staticmethod
+    def _cost(entry):
+        return len(entry[2]) + CATALOG_CACHE_ENTRY_OVERHEAD
+
+    def put(self, key, version, body):
+        entry = (version, hashlib.sha1(body).hexdigest(), body)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= self._cost(old)
+            # A body larger than the whole budget is served but never kept
+            if self._cost(entry) > app.config['CATALOG_CACHE_MAX_BYTES']:
+                return entry
+            self._entries[key] = entry
+            self._size += self._cost(entry)
+            while (self._size > app.config['CATALOG_CACHE_MAX_BYTES']
+                   or len(self._entries) > app.config['CATALOG_CACHE_MAX_ENTRIES']):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= self._cost(evicted)
+                self.evictions += 1
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+catalog_cache = CatalogCache()
+
+
+def bump_catalog_version():
+    # Part of the caller's transaction, so the version only moves if the write commits
+    db.session.execute(update(CatalogVersion).where(CatalogVersion.id == 1)
+                       .values(version=CatalogVersion.version + 1))
+
+
+def cached_catalog_response(key, load, cache_empty=True):
+    """Serve a catalog view from the cache, honouring If-None-Match.
+
+    ``load`` is only called on a miss and returns the JSON-serializable view. With
+    ``cache_empty=False`` an empty view is served but not stored, so arbitrary
+    keys from the client can't fill the cache.
+    """
+    version = catalog_cache.current_version()
+    entry = catalog_cache.get(key, version)
+    if entry is None:
+        view = load()
+        body = app.json.dumps(view).encode('utf-8')
+        if view or cache_empty:
+            entry = catalog_cache.put(key, version, body)
+        else:
+            entry = (version, hashlib.sha1(body).hexdigest(), body)
+    _, etag, body = entry
+
+    if request.if_none_match.contains(etag):
+        catalog_cache.record_not_modified()
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Catalog cache hit-rate counters
+@app.route('/api/admin/catalog_cache', methods=['GET'])
+@jwt_required()
+def get_catalog_cache_stats():
+    current_user = get_jwt_identity()
+    if current_user.get('role') != 'admin':
+        return jsonify({"message": "Unauthorized"}), 403
+    return jsonify(catalog_cache.stats()), 200
+
+# ---------------- Eco Score Engine ----------------
+ECO_SCORE_ATTRIBUTES = ('material', 'certifications', 'manufacturing_location', 'durability', 'end_of_life')
+DEFAULT_ECO_SCORE_WEIGHTS = {
+    # Share of the final 0-100 score each attribute contributes
+    'attributes': {'material': 0.35, 'certifications': 0.2, 'manufacturing_location': 0.1,
+                   'durability': 0.15, 'end_of_life': 0.2},
+    # Material keywords; a product scores its best matching keyword
+    'materials': {'recycled': 0.95, 'bamboo': 0.9, 'hemp': 0.9, 'cork': 0.9, 'organic': 0.85,
+                  'linen': 0.8, 'wood': 0.75, 'glass': 0.75, 'steel': 0.7, 'aluminium': 0.7,
+                  'aluminum': 0.7, 'paper': 0.7, 'wool': 0.65, 'ceramic': 0.6, 'cotton': 0.55,
+                  'leather': 0.35, 'polyester': 0.2, 'nylon': 0.2, 'plastic': 0.15},
+    'certifications': ['fsc', 'gots', 'fair trade', 'fairtrade', 'b corp', 'energy star',
+                       'cradle to cradle', 'rainforest alliance', 'usda organic', 'oeko-tex'],
+    'end_of_life': {'compostable': 1.0, 'biodegradable': 0.95, 'recyclable': 0.8,
+                    'reusable': 0.75, 'repairable': 0.7, 'landfill': 0.1},
+    'durability': {'lifetime': 1.0, 'high': 0.8, 'medium': 0.5, 'low': 0.2},
+    'local': ['local', 'domestic'],
+    'unknown': 0.3,  # Score for an attribute that is left blank
+    'unmatched': 0.5,  # Score for an attribute with no recognised keyword
+}
+
+
+class EcoScoreEngine:
+    """Score products from their sustainability attributes, many at a time.
+
+    Each distinct attribute tuple is turned into a feature row once and memoized
+    with its score (least-recently-used beyond ``ECO_SCORE_MEMO_SIZE``); the
+    weighted sum over a batch is a single NumPy product.
+    """
+
+    def __init__(self, weights):
+        self._lock = threading.Lock()
+        self.set_weights(weights)
+
+    def set_weights(self, weights):
+        with self._lock:
+            self.weights = weights
+            self.material_keywords = list(weights['materials'])
+            self.material_weights = np.array([weights['materials'][k] for k in self.material_keywords])
+            self.attribute_weights = np.array([weights['attributes'][a] for a in ECO_SCORE_ATTRIBUTES])
+            self._memo = OrderedDict()
+
+    @staticmethod
+    def normalize(attributes):
+        return tuple((value or '').strip().lower() for value in attributes)
+
+    def _keyword_score(self, text, table):
+        if not text:
+            return self.weights['unknown']
+        return max((score for keyword, score in table.items() if keyword in text),
+                   default=self.weights['unmatched'])
+
+    def _features(self, key):
+        # Material keyword hits plus the four non-material attribute scores
+        material, certifications, location, durability, end_of_life = key
+        hits = [keyword in material for keyword in self.material_keywords]
+
+        if not certifications:
+            certification_score = self.weights['unknown']
+        else:
+            matched = sum(cert in certifications for cert in self.weights['certifications'])
+            certification_score = min(matched / 2, 1.0)
+
+        if not location:
+            location_score = self.weights['unknown']
+        else:
+            location_score = 1.0 if any(k in location for k in self.weights['local']) else self.weights['unmatched']
+
+        years = re.search(r'(\d+(?:\.\d+)?)\s*(?:years?|yrs?)', durability)
+        if years:
+            durability_score = min(float(years.group(1)) / 10, 1.0)
+        else:
+            durability_score = self._keyword_score(durability, self.weights['durability'])
+
+        end_of_life_score = self._keyword_score(end_of_life, self.weights['end_of_life'])
+        return hits, (certification_score, location_score, durability_score, end_of_life_score)
+
+    def score_many(self, attribute_rows):
+        """Return a 0-100 score per attribute tuple, or None where every attribute is blank."""
+        keys = [self.normalize(row) for row in attribute_rows]
+        # Held for the whole batch so weights and memo can't change underneath it
+        with self._lock:
+            return self._score_keys(keys)
+
+    def _score_keys(self, keys):
+        found, pending = {}, []
+        for key in set(keys):
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                found[key] = self._memo[key]
+            elif any(key):
+                pending.append(key)
+        if pending:
+            features = [self._features(key) for key in pending]
+            hits = np.array([f[0] for f in features], dtype=bool).reshape(len(pending), -1)
+            other = np.array([f[1] for f in features], dtype=float)
+            material = np.where(hits.any(axis=1),
+                                np.where(hits, self.material_weights, 0.0).max(axis=1),
+                                [self.weights['unknown'] if not key[0] else self.weights['unmatched']
+                                 for key in pending])
+            matrix = np.column_stack([material, other])
+            scores = np.clip(np.rint(matrix @ self.attribute_weights * 100), 0, 100).astype(int)
+            found.update(zip(pending, scores.tolist()))
+            self._memo.update((key, found[key]) for key in pending)
+            while len(self._memo) > app.config['ECO_SCORE_MEMO_SIZE']:
+                self._memo.popitem(last=False)
+        return [found.get(key) for key in keys]
+
+    def score_one(self, attributes):
+        return self.score_many([attributes])[0]
+
+
+def load_eco_score_weights():
+    weights = dict(DEFAULT_ECO_SCORE_WEIGHTS)
+    if app.config['ECO_SCORE_WEIGHTS_FILE']:
+        with open(app.config['ECO_SCORE_WEIGHTS_FILE']) as f:
+            weights.update(json.load(f))
+    return weights
+
+
+eco_score_engine = EcoScoreEngine(load_eco_score_weights())
+
+
+def product_attributes(data):
+    # Accept both the API's snake_case and the camelCase keys the product form sends
+    aliases = {'manufacturing_location': 'manufacturingLocation', 'end_of_life': 'endOfLife'}
+    return tuple(data.get(attr, data.get(aliases.get(attr, attr))) for attr in ECO_SCORE_ATTRIBUTES)
+
+
+def rescore_catalog(chunk_size=None):
+    """Rewrite ``Product.eco_score`` for the whole catalog, one id-ordered chunk per transaction.
+
+    Products with no attributes keep their existing score. Returns ``(scanned, updated)``.
+    """
+    chunk_size = chunk_size or app.config['ECO_SCORE_CHUNK_SIZE']
+    product_table = Product.__table__
+    attribute_columns = [product_table.c[attr] for attr in ECO_SCORE_ATTRIBUTES]
+    set_score = (update(product_table)
+                 .where(product_table.c.id == bindparam('b_id'))
+                 .values(eco_score=bindparam('b_eco_score')))
+    scanned = updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(product_table.c.id, product_table.c.eco_score, *attribute_columns)
+            .where(product_table.c.id > last_id)
+            .order_by(product_table.c.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        scores = eco_score_engine.score_many([row[2:] for row in rows])
+        changes = [{'b_id': row.id, 'b_eco_score': score}
+                   for row, score in zip(rows, scores) if score is not None and score != row.eco_score]
+        if changes:
+            db.session.execute(set_score, changes)
+            bump_catalog_version()
+        db.session.commit()
+        scanned += len(rows)
+        updated += len(changes)
+        last_id = rows[-1].id
+    catalog_cache.invalidate()
+    return scanned, updated
+
+
+@app.cli.command('rescore-products')
+def rescore_products_command():
+    """Recompute every product's eco score with the current weights (run nightly)."""
+    scanned, updated = rescore_catalog()
+    print(f"Scanned {scanned} products, updated {updated} eco scores")
+
+# ---------------- Eco Points ----------------
+
+class Leaderboard:
+    """In-memory top-K of users by eco points, updated from each ledger write.
+
+    Holds up to twice ``LEADERBOARD_SIZE`` users. ``floor`` is the highest balance any
+    user outside the buffer can have; a member dropping below it leaves the buffer,
+    and once fewer than K members remain it is refilled with one indexed
+    ``ORDER BY eco_points DESC LIMIT`` query. The buffer is also reloaded every
+    ``LEADERBOARD_REFRESH_INTERVAL`` seconds to pick up other workers' writes.
+    """
+
+    def __init__(self):
+        self._entries = []  # sorted (-eco_points, user_id)
+        self._members = {}  # user_id -> (eco_points, username)
+        self._floor = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        capacity = 2 * app.config['LEADERBOARD_SIZE']
+        rows = db.session.execute(
+            select(User.id, User.username, User.eco_points)
+            .where(User.eco_points > 0)
+            .order_by(User.eco_points.desc())
+            .limit(capacity)
+        ).all()
+        self._members = {row.id: (row.eco_points, row.username) for row in rows}
+        self._entries = sorted((-points, user_id) for user_id, (points, _) in self._members.items())
+        self._floor = rows[-1].eco_points if len(rows) == capacity else 0
+        self._loaded_at = time.monotonic()
+
+    def _remove(self, user_id):
+        points, _ = self._members.pop(user_id)
+        del self._entries[bisect.bisect_left(self._entries, (-points, user_id))]
+
+    def apply(self, balances):
+        """Record committed ``[(user_id, username, eco_points), ...]`` balances."""
+        with self._lock:
+            if self._loaded_at is None:
+                return  # Nothing cached yet; the first read loads from the DB
+            capacity = 2 * app.config['LEADERBOARD_SIZE']
+            for user_id, username, points in balances:
+                if user_id in self._members:
+                    self._remove(user_id)
+                if points > self._floor:
+                    self._members[user_id] = (points, username)
+                    bisect.insort(self._entries, (-points, user_id))
+                while len(self._entries) > capacity:
+                    evicted_points, evicted_id = self._entries.pop()
+                    del self._members[evicted_id]
+                    self._floor = max(self._floor, -evicted_points)
+            if len(self._entries) < app.config['LEADERBOARD_SIZE'] and self._floor > 0:
+                self._loaded_at = None  # Not enough known members; refill on next read
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def top(self, limit):
+        with self._lock:
+            if (self._loaded_at is None or
+                    time.monotonic() - self._loaded_at >= app.config['LEADERBOARD_REFRESH_INTERVAL']):
+                self._refill()
+            return [(user_id, self._members[user_id][1], -neg_points)
+                    for neg_points, user_id in self._entries[:limit]]
+
+
+leaderboard = Leaderboard()
+
+
+def record_ledger_entries(entries):
+    """Insert ``[(user_id, delta, reason, reference_id), ...]`` ledger rows.
+
+    Balances must already be updated in the same transaction; the resulting
+    balances are handed to the leaderboard once the transaction commits.
+    Returns the new entry ids in order.
+    """
+    now = datetime.utcnow()
+    entry_ids = db.session.scalars(
+        insert(EcoPointsLedger).returning(EcoPointsLedger.id, sort_by_parameter_order=True), [
+            {'user_id': user_id, 'delta': delta, 'reason': reason, 'reference_id': reference_id,
+             'created_at': now}
+            for user_id, delta, reason, reference_id in entries]).all()
+    user_ids = {user_id for user_id, _, _, _ in entries}
+    balances = db.session.execute(
+        select(User.id, User.username, func.coalesce(User.eco_points, 0))
+        .where(User.id.in_(user_ids))).all()
+    db.session.info.setdefault('leaderboard_updates', []).extend(tuple(b) for b in balances)
+    return entry_ids
+
+
+def credit_eco_points(entries):
+    """Add ledger entries and apply their deltas to ``User.eco_points`` in one transaction."""
+    totals = {}
+    for user_id, delta, _, _ in entries:
+        totals[user_id] = totals.get(user_id, 0) + delta
+    user_table = User.__table__
+    db.session.execute(
+        update(user_table)
+        .where(user_table.c.id == bindparam('b_user_id'))
+        .values(eco_points=func.coalesce(user_table.c.eco_points, 0) + bindparam('b_points')),
+        [{'b_user_id': user_id, 'b_points': amount} for user_id, amount in totals.items()]
+    )
+    record_ledger_entries(entries)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _publish_leaderboard_updates(session):
+    updates = session.info.pop('leaderboard_updates', None)
+    if updates:
+        leaderboard.apply(updates)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_leaderboard_updates(session):
+    session.info.pop('leaderboard_updates', None)
+
+
+def reconcile_eco_points(fix=True, chunk_size=1000):
+    """Check every ``User.eco_points`` against its ledger total.
+
+    Users and per-user ledger sums are streamed in user id order and merged, so
+    memory holds one chunk of each plus the mismatches. Returns the mismatches as
+    ``(user_id, balance, ledger_total)``; with ``fix`` balances are reset to the ledger
+    unless they changed since they were read (the next run picks those up).
+    """
+    ledger_table = EcoPointsLedger.__table__
+    users = db.session.execute(
+        select(User.id, func.coalesce(User.eco_points, 0)).order_by(User.id)
+        .execution_options(yield_per=chunk_size))
+    totals = iter(db.session.execute(
+        select(ledger_table.c.user_id, func.sum(ledger_table.c.delta))
+        .group_by(ledger_table.c.user_id).order_by(ledger_table.c.user_id)
+        .execution_options(yield_per=chunk_size)))
+
+    mismatches = []
+    total = next(totals, None)
+    for user_id, balance in users:
+        while total is not None and total[0] < user_id:
+            total = next(totals, None)  # Ledger rows for deleted users
+        expected = total[1] if total is not None and total[0] == user_id else 0
+        if balance != expected:
+            mismatches.append((user_id, balance, expected))
+
+    if fix and mismatches:
+        user_table = User.__table__
+        # A credit committed after the scan moved both the balance and the ledger,
+        # so only overwrite balances that still hold the value that was checked
+        set_balance = (update(user_table)
+                       .where(user_table.c.id == bindparam('b_user_id'),
+                              func.coalesce(user_table.c.eco_points, 0) == bindparam('b_balance'))
+                       .values(eco_points=bindparam('b_points')))
+        for start in range(0, len(mismatches), chunk_size):
+            db.session.execute(set_balance, [{'b_user_id': user_id, 'b_balance': balance, 'b_points': expected}
+                                             for user_id, balance, expected in mismatches[start:start + chunk_size]])
+            db.session.commit()
+        leaderboard.invalidate()
+    return mismatches
+
+
+@app.cli.command('reconcile-eco-points')
+@click.option('--dry-run', is_flag=True, help='Report mismatches without fixing them.')
+def reconcile_eco_points_command(dry_run):
+    """Reset any eco point balance that disagrees with the ledger (run nightly)."""
+    mismatches = reconcile_eco_points(fix=not dry_run)
+    for user_id, balance, expected in mismatches:
+        print(f"user {user_id}: balance {balance}, ledger {expected}")
+    print(f"{len(mismatches)} mismatched balances{' (not fixed)' if dry_run and mismatches else ''}")
+
 # ---------------- User Routes ----------------
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -88,13 +1403,18 @@ def register():
     password = request.json.get('password')
     role = request.json.get('role', 'customer')  # Default to customer if not provided
 
+    if not username or not password:
+        return jsonify({"message": "Username and password are required!"}), 400
+
     if User.query.filter_by(username=username).first():
         return jsonify({"message": "User already exists!"}), 400
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    hashed_password = hash_password(password)
     new_user = User(username=username, password=hashed_password, role=role)  # Include role in user creation
     db.session.add(new_user)
+    bump_account_version()
     db.session.commit()
+    unknown_usernames.discard((User.__tablename__, username))
 
     return jsonify({"message": "User registered successfully!"}), 201
 
@@ -103,8 +1423,8 @@ def login():
     username = request.json.get('username')
     password = request.json.get('password')
 
-    user = User.query.filter_by(username=username).first()
-    if user and bcrypt.check_password_hash(user.password, password):
+    user = authenticate(User, username, password)
+    if user:
         access_token = create_access_token(identity={'username': user.username, 'id': user.id, 'role': user.role})
         return jsonify(access_token=access_token), 200
     else:
@@ -116,16 +1436,419 @@ def register_admin():
     username = request.json.get('username')
     password = request.json.get('password')
 
+    if not username or not password:
+        return jsonify({"message": "Username and password are required!"}), 400
+
     if Admin.query.filter_by(username=username).first():
         return jsonify({"message": "Admin already exists!"}), 400
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    hashed_password = hash_password(password)
     new_admin = Admin(username=username, password=hashed_password)
     db.session.add(new_admin)
+    bump_account_version()
     db.session.commit()
+    unknown_usernames.discard((Admin.__tablename__, username))
 
     return jsonify({"message": "Admin registered successfully!"}), 201
 
+# ---------------- Product Routes ----------------
+def serialize_product(product):
+    return {
+        'id': product.id,
+        'name': product.name,
+        'description': product.description,
+        'price': product.price,
+        'eco_score': product.eco_score,
+        'user_id': product.user_id,
+        'material': product.material,
+        'certifications': product.certifications,
+        'manufacturing_location': product.manufacturing_location,
+        'durability': product.durability,
+        'end_of_life': product.end_of_life
+    }
+
+def apply_product_fields(product, data):
+    # Returns an error message for invalid input, otherwise updates ``product`` in place
+    for field in ('name', 'description'):
+        if field in data:
+            if not isinstance(data[field], str) or not data[field].strip():
+                return f"Invalid {field}!"
+            setattr(product, field, data[field].strip())
+    if 'price' in data:
+        try:
+            price = float(data['price'])
+        except (TypeError, ValueError):
+            return "Invalid price!"
+        if price < 0:
+            return "Invalid price!"
+        # Only a changed price is a new list price; the edit form re-submits the
+        # current (possibly repriced) price, which must not replace base_price
+        if price != product.price:
+            product.price = price
+            product.base_price = price
+    attributes_changed = False
+    for attr, value in zip(ECO_SCORE_ATTRIBUTES, product_attributes(data)):
+        if value is not None:
+            if not isinstance(value, str):
+                return f"Invalid {attr}!"
+            setattr(product, attr, value.strip() or None)
+            attributes_changed = True
+    if attributes_changed:
+        # Products with attributes are always scored server-side; a client score is ignored
+        product.eco_score = eco_score_engine.score_one(
+            [getattr(product, attr) for attr in ECO_SCORE_ATTRIBUTES])
+    elif 'eco_score' in data:
+        eco_score = data['eco_score']
+        if eco_score is not None:
+            if isinstance(eco_score, bool):
+                return "Invalid eco_score!"
+            try:
+                eco_score = int(eco_score)
+            except (TypeError, ValueError):
+                return "Invalid eco_score!"
+            if not 0 <= eco_score <= 100:
+                return "Invalid eco_score!"
+        product.eco_score = eco_score
+    return None
+
+@app.route('/api/products', methods=['GET'])
+def get_products():
+    seller_id = request.args.get('seller_id', type=int)
+    if seller_id is None:
+        return cached_catalog_response('all', lambda: [
+            serialize_product(p) for p in Product.query.order_by(Product.id)])
+    # seller_id is unauthenticated input, so sellers without products aren't cached
+    return cached_catalog_response(('seller', seller_id), lambda: [
+        serialize_product(p) for p in Product.query.filter_by(user_id=seller_id).order_by(Product.id)],
+        cache_empty=False)
+
+MAX_ECO_SCORE_BATCH = 10000
+
+@app.route('/api/calculate-eco-score', methods=['POST'])
+@jwt_required()
+def calculate_eco_score():
+    """Score one product's attributes, or a batch sent as ``{"products": [...]}``."""
+    data = request.json or {}
+    single = 'products' not in data
+    products = [data] if single else data['products']
+    if not isinstance(products, list) or not all(isinstance(p, dict) for p in products):
+        return jsonify({"message": "Products must be a list of objects!"}), 400
+    if len(products) > MAX_ECO_SCORE_BATCH:
+        return jsonify({"message": f"At most {MAX_ECO_SCORE_BATCH} products per request!"}), 400
+
+    rows = [product_attributes(p) for p in products]
+    if any(value is not None and not isinstance(value, str) for row in rows for value in row):
+        return jsonify({"message": "Attributes must be strings!"}), 400
+
+    scores = eco_score_engine.score_many(rows)
+    if single:
+        return jsonify({"eco_score": scores[0]}), 200
+    return jsonify({"eco_scores": scores}), 200
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_RANK = 'bm25(product_fts, 10.0, 1.0)'  # Name matches weigh more than description
+SEARCH_CURSOR_COLUMNS = [column('rank', db.Float), column('id', db.Integer)]
+ECO_SCORE_FACETS = [(0, 20), (20, 40), (40, 60), (60, 80), (80, None)]
+PRICE_FACETS = [(0, 10), (10, 25), (25, 50), (50, 100), (100, None)]
+
+
+def build_match_query(q):
+    # Quote each term so user input can't inject FTS5 syntax; every term is a prefix match
+    terms = re.findall(r'\w+', q)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def facet_columns(facet, column_name, ranges):
+    # One SUM(CASE ...) per bucket, aliased "<facet>:<label>"
+    columns = {}
+    for low, high in ranges:
+        label = f"{low}+" if high is None else f"{low}-{high}"
+        condition = f"{column_name} >= {low}" + ("" if high is None else f" AND {column_name} < {high}")
+        columns[label] = f'SUM(CASE WHEN {condition} THEN 1 ELSE 0 END) AS "{facet}:{label}"'
+    return columns
+
+
+@app.route('/api/products/search', methods=['GET'])
+def search_products():
+    """BM25-ranked product search with eco_score/price filters, facets and keyset paging."""
+    if not product_search_enabled:
+        return jsonify({"message": "Product search is not available!"}), 501
+
+    match = build_match_query(request.args.get('q', ''))
+    if not match:
+        return jsonify({"message": "Search query is required!"}), 400
+
+    filters = ['product_fts MATCH :match']
+    params = {'match': match}
+    for arg, condition in (('min_price', 'p.price >= :min_price'), ('max_price', 'p.price <= :max_price'),
+                           ('min_eco_score', 'p.eco_score >= :min_eco_score'),
+                           ('max_eco_score', 'p.eco_score <= :max_eco_score')):
+        value = request.args.get(arg, type=float)
+        if value is not None:
+            filters.append(condition)
+            params[arg] = value
+
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        after = decode_cursor(cursor, SEARCH_CURSOR_COLUMNS)
+        if after is None:
+            return jsonify({"message": "Invalid cursor!"}), 400
+
+    limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    page_filters = list(filters)
+    if after is not None:
+        page_filters.append(f'({SEARCH_RANK}, p.id) > (:after_rank, :after_id)')
+    rows = db.session.execute(text(f"""
+        SELECT p.id, p.name, p.description, p.price, p.eco_score, p.user_id, {SEARCH_RANK} AS rank
+        FROM product_fts JOIN product p ON p.id = product_fts.rowid
+        WHERE {' AND '.join(page_filters)}
+        ORDER BY rank, p.id
+        LIMIT :limit""").columns(id=db.Integer, name=db.String, description=db.String, price=db.Float,
+                                  eco_score=db.Integer, user_id=db.Integer, rank=db.Float),
+        {**params, 'limit': limit + 1, 'after_rank': after and after[0], 'after_id': after and after[1]}).all()
+
+    body = {'results': [dict(row._mapping) for row in rows[:limit]]}
+
+    # Facet counts cover the whole match set, so they are only computed for the first page
+    if after is None:
+        eco_columns = facet_columns('eco_score', 'p.eco_score', ECO_SCORE_FACETS)
+        eco_columns['unscored'] = 'SUM(CASE WHEN p.eco_score IS NULL THEN 1 ELSE 0 END) AS "eco_score:unscored"'
+        price_columns = facet_columns('price', 'p.price', PRICE_FACETS)
+        counts = db.session.execute(text(f"""
+            SELECT COUNT(*) AS total, {', '.join([*eco_columns.values(), *price_columns.values()])}
+            FROM product_fts JOIN product p ON p.id = product_fts.rowid
+            WHERE {' AND '.join(filters)}""").columns(total=db.Integer), params).one()._mapping
+        body['total'] = counts['total']
+        body['facets'] = {
+            'eco_score': {label: counts[f'eco_score:{label}'] or 0 for label in eco_columns},
+            'price': {label: counts[f'price:{label}'] or 0 for label in price_columns},
+        }
+
+    response = jsonify(body)
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.headers['X-Next-Cursor'] = encode_cursor([last.rank, last.id])
+    return response, 200
+
+@app.route('/api/products/<int:product_id>', methods=['GET'])
+def get_product(product_id):
+    product = Product.query.get(product_id)
+    if not product:
+        return jsonify({"message": "Product not found!"}), 404
+    return jsonify(serialize_product(product)), 200
+
+@app.route('/api/products', methods=['POST'])
+@jwt_required()
+def create_product():
+    current_user = get_jwt_identity()
+    if current_user.get('role') != 'seller':
+        return jsonify({"message": "Unauthorized"}), 403
+
+    data = request.json or {}
+    if any(field not in data for field in ('name', 'description', 'price')):
+        return jsonify({"message": "Name, description and price are required!"}), 400
+
+    product = Product(user_id=current_user['id'])
+    error = apply_product_fields(product, data)
+    if error:
+        return jsonify({"message": error}), 400
+
+    db.session.add(product)
+    bump_catalog_version()
+    db.session.commit()
+    catalog_cache.invalidate()
+
+    return jsonify(serialize_product(product)), 201
+
+@app.route('/api/products/<int:product_id>', methods=['PUT'])
+@jwt_required()
+def update_product(product_id):
+    current_user = get_jwt_identity()
+    product = Product.query.get(product_id)
+    if not product:
+        return jsonify({"message": "Product not found!"}), 404
+    if current_user.get('role') != 'admin' and product.user_id != current_user.get('id'):
+        return jsonify({"message": "Unauthorized"}), 403
+
+    error = apply_product_fields(product, request.json or {})
+    if error:
+        db.session.rollback()
+        return jsonify({"message": error}), 400
+
+    bump_catalog_version()
+    db.session.commit()
+    catalog_cache.invalidate()
+
+    return jsonify(serialize_product(product)), 200
+
+@app.route('/api/products/<int:product_id>', methods=['DELETE'])
+@jwt_required()
+def delete_product(product_id):
+    current_user = get_jwt_identity()
+    product = Product.query.get(product_id)
+    if not product:
+        return jsonify({"message": "Product not found!"}), 404
+    if current_user.get('role') != 'admin' and product.user_id != current_user.get('id'):
+        return jsonify({"message": "Unauthorized"}), 403
+
+    db.session.delete(product)
+    bump_catalog_version()
+    db.session.commit()
+    catalog_cache.invalidate()
+
+    return jsonify({"message": "Product deleted successfully!"}), 200
+
+# ---------------- Dynamic Pricing Routes ----------------
+PRICING_CHUNK_SIZE = 2000
+PRICING_RULE_FIELDS = {
+    # field: (camelCase key sent by the pricing form, default)
+    'min_price': ('minPrice', None),
+    'max_price': ('maxPrice', None),
+    'eco_premium': ('ecoPremium', 0.1),
+    'demand_sensitivity': ('demandSensitivity', 0.2),
+}
+
+
+def serialize_pricing_rule(rule):
+    return {
+        'min_price': rule.min_price,
+        'max_price': rule.max_price,
+        'eco_premium': rule.eco_premium,
+        'demand_sensitivity': rule.demand_sensitivity,
+        'updated_at': rule.updated_at
+    }
+
+
+def compute_prices(rule, base_prices, eco_scores, demand):
+    """Apply a pricing rule to whole arrays at once.
+
+    price = base * (1 + eco_premium * eco_score/100) * (1 + demand_sensitivity * demand),
+    clipped to the rule's range and rounded to cents. Unscored products get no
+    eco premium; ``demand`` is a signal in [-1, 1] per product.
+    """
+    eco = np.nan_to_num(eco_scores / 100.0, nan=0.0)
+    prices = (base_prices
+              * (1 + rule.eco_premium * eco)
+              * (1 + rule.demand_sensitivity * np.clip(np.nan_to_num(demand), -1.0, 1.0)))
+    return np.round(np.clip(prices, rule.min_price, rule.max_price), 2)
+
+
+def reprice_seller(seller_id, rule, demand=None, dry_run=False):
+    """Reprice every product of a seller in one vectorized pass.
+
+    ``demand`` maps product id to a demand signal. Changes are written with chunked
+    executemany UPDATEs guarded on the price that was read, so a concurrent edit
+    wins over the repricing. Returns ``(diff, applied)``.
+    """
+    product_table = Product.__table__
+    rows = db.session.execute(
+        select(product_table.c.id, product_table.c.price, product_table.c.base_price,
+               product_table.c.eco_score)
+        .where(product_table.c.user_id == seller_id)
+        .order_by(product_table.c.id)
+    ).all()
+    if not rows:
+        return [], 0
+
+    ids = np.array([row.id for row in rows])
+    prices = np.array([row.price for row in rows], dtype=float)
+    base_prices = np.array([np.nan if row.base_price is None else row.base_price for row in rows])
+    base_prices = np.where(np.isnan(base_prices), prices, base_prices)
+    eco_scores = np.array([np.nan if row.eco_score is None else row.eco_score for row in rows])
+
+    signals = np.zeros(len(ids))
+    if demand:
+        demand_ids = np.array(list(demand.keys()))
+        positions = np.searchsorted(ids, demand_ids)
+        found = (positions < len(ids)) & (ids[np.minimum(positions, len(ids) - 1)] == demand_ids)
+        signals[positions[found]] = np.array(list(demand.values()), dtype=float)[found]
+
+    new_prices = compute_prices(rule, base_prices, eco_scores, signals)
+    changed = np.flatnonzero(np.abs(new_prices - prices) >= 0.005)
+    diff = [{'id': int(ids[i]), 'old_price': float(prices[i]), 'new_price': float(new_prices[i])}
+            for i in changed]
+    if dry_run or not diff:
+        return diff, 0
+
+    set_price = (update(product_table)
+                 .where(product_table.c.id == bindparam('b_id'),
+                        product_table.c.price == bindparam('b_old_price'))
+                 .values(price=bindparam('b_new_price'),
+                         base_price=func.coalesce(product_table.c.base_price, bindparam('b_old_price'))))
+    applied = 0
+    for start in range(0, len(diff), PRICING_CHUNK_SIZE):
+        chunk = [{'b_id': d['id'], 'b_old_price': d['old_price'], 'b_new_price': d['new_price']}
+                 for d in diff[start:start + PRICING_CHUNK_SIZE]]
+        applied += db.session.execute(set_price, chunk).rowcount
+        bump_catalog_version()
+        db.session.commit()
+    catalog_cache.invalidate()
+    return diff, applied
+
+
+@app.route('/api/set-pricing', methods=['GET', 'POST'])
+@jwt_required()
+def set_pricing():
+    current_user = get_jwt_identity()
+    if current_user.get('role') != 'seller':
+        return jsonify({"message": "Unauthorized"}), 403
+
+    rule = PricingRule.query.filter_by(user_id=current_user['id']).first()
+    if request.method == 'GET':
+        if not rule:
+            return jsonify({"message": "No pricing rule set!"}), 404
+        return jsonify(serialize_pricing_rule(rule)), 200
+
+    data = request.json or {}
+    values = {}
+    for field, (alias, default) in PRICING_RULE_FIELDS.items():
+        value = data.get(field, data.get(alias))
+        if value is None:
+            value = getattr(rule, field) if rule else default
+        try:
+            values[field] = float(value)
+        except (TypeError, ValueError):
+            return jsonify({"message": f"Invalid {field}!"}), 400
+        if not np.isfinite(values[field]) or values[field] < 0:
+            return jsonify({"message": f"Invalid {field}!"}), 400
+    if values['min_price'] > values['max_price']:
+        return jsonify({"message": "Minimum price can't exceed maximum price!"}), 400
+
+    if rule is None:
+        rule = PricingRule(user_id=current_user['id'])
+        db.session.add(rule)
+    for field, value in values.items():
+        setattr(rule, field, value)
+    db.session.commit()
+
+    return jsonify(serialize_pricing_rule(rule)), 200
+
+
+@app.route('/api/reprice', methods=['POST'])
+@jwt_required()
+def reprice():
+    """Apply the seller's pricing rule to their catalog; ``dry_run`` only returns the diff."""
+    current_user = get_jwt_identity()
+    if current_user.get('role') != 'seller':
+        return jsonify({"message": "Unauthorized"}), 403
+
+    rule = PricingRule.query.filter_by(user_id=current_user['id']).first()
+    if not rule:
+        return jsonify({"message": "No pricing rule set!"}), 404
+
+    data = request.json or {}
+    try:
+        demand = {int(product_id): float(signal)
+                  for product_id, signal in (data.get('demand') or {}).items()}
+    except (AttributeError, TypeError, ValueError):
+        return jsonify({"message": "Demand must map product ids to numbers!"}), 400
+
+    dry_run = bool(data.get('dry_run', False))
+    diff, applied = reprice_seller(current_user['id'], rule, demand, dry_run=dry_run)
+    return jsonify({"dry_run": dry_run, "changes": diff, "applied": applied}), 200
+
 # ---------------- Recycle Program Routes ----------------
 @app.route('/api/recycle', methods=['POST'])
 @jwt_required()
@@ -140,17 +1863,12 @@ def submit_recycle_item():
         description=data.get('description', ''),
         user_id=current_user['id']
     )
-    db.session.add(recycle_item)
-    db.session.commit()
+    run_write(lambda: db.session.add(recycle_item))
 
     return jsonify({"message": "Recycle item submitted successfully!"}), 201
 
-@app.route('/api/recycle_items', methods=['GET'])
-@jwt_required()
-def get_recycle_items():
-    current_user = get_jwt_identity()
-    items = RecycleItem.query.filter_by(user_id=current_user['id']).all()
-    return jsonify([{
+def serialize_recycle_item(item):
+    return {
         'id': item.id,
         'product_name': item.product_name,
         'material': item.material,
@@ -158,7 +1876,14 @@ def get_recycle_items():
         'description': item.description,
         'status': item.status,
         'date_submitted': item.date_submitted
-    } for item in items]), 200
+    }
+
+@app.route('/api/recycle_items', methods=['GET'])
+@jwt_required()
+def get_recycle_items():
+    current_user = get_jwt_identity()
+    query = RecycleItem.query.filter_by(user_id=current_user['id'])
+    return paginated_response(query, [RecycleItem.id], serialize_recycle_item)
 
 # ---------------- Admin Routes ----------------
 @app.route('/api/admin/login', methods=['POST'])
@@ -166,8 +1891,8 @@ def admin_login():
     username = request.json.get('username')
     password = request.json.get('password')
 
-    admin = Admin.query.filter_by(username=username).first()
-    if admin and bcrypt.check_password_hash(admin.password, password):
+    admin = authenticate(Admin, username, password)
+    if admin:
         access_token = create_access_token(identity={'username': admin.username, 'role': 'admin'})
         return jsonify(access_token=access_token), 200
     else:
@@ -181,17 +1906,19 @@ def get_admin_recycle_items():
     if current_user.get('role') != 'admin':
         return jsonify({"message": "Unauthorized"}), 403  # Check if user is an admin
 
-    # Get all pending recyclable items
-    items = RecycleItem.query.filter_by(status="Pending").all()
-    return jsonify([{
-        'id': item.id,
-        'product_name': item.product_name,
-        'material': item.material,
-        'condition': item.condition,
-        'description': item.description,
-        'status': item.status,
-        'date_submitted': item.date_submitted
-    } for item in items]), 200
+    # Pending recyclable items, oldest first
+    query = RecycleItem.query.filter_by(status="Pending")
+    return paginated_response(query, [RecycleItem.date_submitted, RecycleItem.id],
+                              serialize_recycle_item)
+
+RECYCLE_DECISIONS = {'Approved': 'approved', 'Rejected': 'rejected'}
+MAX_BULK_DECISIONS = 5000
+VOUCHER_DISCOUNT = 15  # Percentage discount issued per approved item
+VOUCHER_VALIDITY = timedelta(days=30)
+ECO_POINTS_PER_APPROVAL = 10
+REDEMPTION_COST = 100  # Eco points spent per redemption voucher
+REDEMPTION_DISCOUNT = 10  # Percentage discount of a redemption voucher
+VOUCHER_CODE_ALPHABET = string.digits + string.ascii_uppercase
 
 # Approve or reject recycle item
 @app.route('/api/admin/recycle_item/<int:item_id>', methods=['PUT'])
@@ -206,41 +1933,134 @@ def approve_recycle_item(item_id):
         return jsonify({"message": "Item not found!"}), 404
 
     status = request.json.get('status')
-    if status not in ['Approved', 'Rejected']:
+    if not isinstance(status, str) or status not in RECYCLE_DECISIONS:
         return jsonify({"message": "Invalid status!"}), 400
 
-    item.status = status
-    db.session.commit()
-
-    # Generate voucher if approved
-    if status == 'Approved':
-        generate_voucher(item.user_id, discount_value=15)  # Generate a 15% voucher
+    outcome = run_write(lambda: apply_recycle_decisions({item_id: status})[item_id])
+    if outcome == 'already_processed':
+        return jsonify({"message": "Item already processed!"}), 409
 
     return jsonify({"message": f"Item {status} successfully!"}), 200
 
-# Function to generate a voucher with a specific discount
-def generate_voucher(user_id, discount_value=15):
-    voucher_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))
-    voucher = Voucher(
-        code=voucher_code,
-        discount_value=discount_value,
-        user_id=user_id,
-        valid_until=datetime.utcnow() + timedelta(days=30)
-    )
-    db.session.add(voucher)
-    db.session.commit()
-
-@app.route('/api/vouchers', methods=['GET'])
+# Bulk approve or reject recycle items in a single transaction
+@app.route('/api/admin/recycle_items/bulk', methods=['POST'])
 @jwt_required()
-def get_vouchers():
+def bulk_update_recycle_items():
     current_user = get_jwt_identity()
-    vouchers = Voucher.query.filter_by(user_id=current_user['id'], is_redeemed=False).all()
-    return jsonify([{
+    if current_user.get('role') != 'admin':
+        return jsonify({"message": "Unauthorized"}), 403
+
+    decisions = (request.json or {}).get('decisions')
+    if not isinstance(decisions, list) or not decisions:
+        return jsonify({"message": "No decisions provided!"}), 400
+    if len(decisions) > MAX_BULK_DECISIONS:
+        return jsonify({"message": f"At most {MAX_BULK_DECISIONS} decisions per request!"}), 400
+
+    # Validate up front; only well-formed, first-seen ids reach the database
+    results = []
+    valid = {}
+    for decision in decisions:
+        decision = decision if isinstance(decision, dict) else {}
+        item_id, status = decision.get('id'), decision.get('status')
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            outcome = 'invalid_id'
+        elif not isinstance(status, str) or status not in RECYCLE_DECISIONS:
+            outcome = 'invalid_status'
+        elif item_id in valid:
+            outcome = 'duplicate'
+        else:
+            valid[item_id] = status
+            outcome = None
+        results.append({'id': item_id, 'status': status, 'outcome': outcome})
+
+    outcomes = apply_recycle_decisions(valid)
+    db.session.commit()
+
+    summary = {}
+    for result in results:
+        if result['outcome'] is None:
+            result['outcome'] = outcomes[result['id']]
+        summary[result['outcome']] = summary.get(result['outcome'], 0) + 1
+
+    return jsonify({"results": results, "summary": summary}), 200
+
+
+
+def voucher_code(seed_id, kind=''):
+    """Build a voucher code that cannot collide with any other.
+
+    After an optional ``kind`` letter, seven characters are the seed id in base 36
+    (the approved item, or the ledger entry for a redemption, issues exactly one
+    voucher) and the last six are random so codes stay hard to guess.
+    """
+    prefix = ''
+    while seed_id or len(prefix) < 7:
+        seed_id, digit = divmod(seed_id, 36)
+        prefix = VOUCHER_CODE_ALPHABET[digit] + prefix
+    return kind + prefix + ''.join(secrets.choice(VOUCHER_CODE_ALPHABET) for _ in range(6))
+
+
+def apply_recycle_decisions(decisions):
+    """Apply ``{item_id: 'Approved' | 'Rejected'}`` to pending items without committing.
+
+    Statuses change with one set-based UPDATE per decision, approvals get their
+    vouchers bulk-inserted and eco points credited per user. Returns an outcome
+    for every id: ``approved``, ``rejected``, ``already_processed`` or ``not_found``.
+    """
+    outcomes = {}
+    approved = []
+    for status, outcome in RECYCLE_DECISIONS.items():
+        ids = [item_id for item_id, decision in decisions.items() if decision == status]
+        if not ids:
+            continue
+        # Only pending items transition, so a concurrent decision can't issue a second voucher
+        rows = db.session.execute(
+            update(RecycleItem)
+            .where(RecycleItem.id.in_(ids), RecycleItem.status == 'Pending')
+            .values(status=status)
+            .returning(RecycleItem.id, RecycleItem.user_id)
+        ).all()
+        for item_id, user_id in rows:
+            outcomes[item_id] = outcome
+        if status == 'Approved':
+            approved = rows
+
+    unresolved = [item_id for item_id in decisions if item_id not in outcomes]
+    if unresolved:
+        existing = {item_id for (item_id,) in db.session.query(RecycleItem.id)
+                    .filter(RecycleItem.id.in_(unresolved))}
+        for item_id in unresolved:
+            outcomes[item_id] = 'already_processed' if item_id in existing else 'not_found'
+
+    if approved:
+        valid_until = datetime.utcnow() + VOUCHER_VALIDITY
+        db.session.execute(insert(Voucher), [{
+            'code': voucher_code(item_id),
+            'discount_value': VOUCHER_DISCOUNT,
+            'user_id': user_id,
+            'valid_until': valid_until,
+            'is_redeemed': False,
+        } for item_id, user_id in approved])
+
+        credit_eco_points([(user_id, ECO_POINTS_PER_APPROVAL, 'recycle_approval', item_id)
+                           for item_id, user_id in approved])
+
+    return outcomes
+
+def serialize_voucher(voucher):
+    return {
         'code': voucher.code,
         'discount_value': voucher.discount_value,
         'valid_until': voucher.valid_until,
         'is_redeemed': voucher.is_redeemed
-    } for voucher in vouchers]), 200
+    }
+
+@app.route('/api/vouchers', methods=['GET'])
+@jwt_required()
+def get_vouchers():
+    current_user = get_jwt_identity()
+    query = Voucher.query.filter_by(user_id=current_user['id'], is_redeemed=False)
+    return paginated_response(query, [Voucher.id], serialize_voucher)
 
 @app.route('/api/eco_points', methods=['GET'])
 @jwt_required()
@@ -251,6 +2071,101 @@ def get_eco_points():
     user = User.query.get(current_user['id'])
     return jsonify({"points": user.eco_points})
 
+@app.route('/api/eco_points/history', methods=['GET'])
+@jwt_required()
+def get_eco_points_history():
+    current_user = get_jwt_identity()
+    query = EcoPointsLedger.query.filter_by(user_id=current_user['id'])
+    return paginated_response(query, [EcoPointsLedger.id], lambda entry: {
+        'id': entry.id,
+        'delta': entry.delta,
+        'reason': entry.reason,
+        'reference_id': entry.reference_id,
+        'created_at': entry.created_at
+    })
+
+# Spend eco points on a discount voucher
+@app.route('/api/eco_points/redeem', methods=['POST'])
+@jwt_required()
+def redeem_eco_points():
+    current_user = get_jwt_identity()
+    if 'id' not in current_user:
+        return jsonify({"message": "Unauthorized"}), 403
+
+    # Guarded decrement so concurrent redemptions can't overdraw the balance
+    user_table = User.__table__
+    spent = db.session.execute(
+        update(user_table)
+        .where(user_table.c.id == current_user['id'], user_table.c.eco_points >= REDEMPTION_COST)
+        .values(eco_points=user_table.c.eco_points - REDEMPTION_COST)
+    ).rowcount
+    if not spent:
+        db.session.rollback()
+        return jsonify({"message": "Not enough eco points!"}), 400
+
+    entry_id, = record_ledger_entries([(current_user['id'], -REDEMPTION_COST, 'redemption', None)])
+    voucher = Voucher(
+        code=voucher_code(entry_id, kind='R'),
+        discount_value=REDEMPTION_DISCOUNT,
+        user_id=current_user['id'],
+        valid_until=datetime.utcnow() + VOUCHER_VALIDITY
+    )
+    db.session.add(voucher)
+    db.session.flush()
+    db.session.execute(update(EcoPointsLedger).where(EcoPointsLedger.id == entry_id)
+                       .values(reference_id=voucher.id))
+    db.session.commit()
+
+    return jsonify(serialize_voucher(voucher)), 201
+
+@app.route('/api/leaderboard', methods=['GET'])
+def get_leaderboard():
+    limit = request.args.get('limit', app.config['LEADERBOARD_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['LEADERBOARD_SIZE']))
+    return jsonify([{
+        'rank': rank,
+        'username': username,
+        'eco_points': points
+    } for rank, (_, username, points) in enumerate(leaderboard.top(limit), start=1)]), 200
+
+# ---------------- Analytics Routes ----------------
+@app.route('/api/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    """Recycling, voucher and catalog figures read only from the rollup tables."""
+    current_user = get_jwt_identity()
+    if current_user.get('role') != 'admin':
+        return jsonify({"message": "Unauthorized"}), 403
+
+    days = max(1, min(request.args.get('days', 30, type=int), 366))
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+
+    recycling = RecycleDailyRollup.query.filter(RecycleDailyRollup.day >= since).order_by(
+        RecycleDailyRollup.day, RecycleDailyRollup.material, RecycleDailyRollup.status)
+    vouchers = VoucherDailyRollup.query.filter(VoucherDailyRollup.day >= since).order_by(
+        VoucherDailyRollup.day)
+    bands = {band.band: band.total for band in ProductEcoScoreBand.query}
+    labels = [f"{low}+" if high is None else f"{low}-{high}" for low, high in ECO_SCORE_FACETS]
+
+    return jsonify({
+        'since': since.isoformat(),
+        'recycling': [{
+            'day': row.day.isoformat(),
+            'material': row.material,
+            'status': row.status,
+            'count': row.total
+        } for row in recycling],
+        'vouchers': [{
+            'day': row.day.isoformat(),
+            'issued': row.issued,
+            'redeemed': row.redeemed
+        } for row in vouchers],
+        'products_by_eco_score': {
+            **{label: bands.get(band, 0) for band, label in enumerate(labels)},
+            'unscored': bands.get(-1, 0)
+        }
+    }), 200
+
 if __name__ == '__main__':
     # Create the necessary tables if they don't exist
     with app.app_context():
@@ -0,0 +1,83 @@
+"""Login throughput benchmark.
+
+Registers a batch of users against a throwaway SQLite database, then fires
+concurrent /api/login requests for each hashing pool size and reports
+logins/sec and latency percentiles.
+
+    python bench_login.py --users 50 --clients 16 --rounds 10 --pool-sizes 0 1 2 4
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+gsm = None  # Loaded in main() so hashing pool processes, which re-import this script, skip it
+
+
+def load_app():
+    global gsm
+    db_dir = tempfile.mkdtemp(prefix='gsm-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    import app  # DATABASE_URL must be set before import
+    gsm = app
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def login_once(client, username):
+    start = time.perf_counter()
+    response = client.post('/api/login', json={'username': username, 'password': 'bench-pass'})
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.get_json()
+    return elapsed
+
+
+def run(pool_size, usernames, clients, requests_per_client):
+    gsm.configure_password_pool(pool_size)
+    # Warm the pool so process start-up isn't counted
+    gsm.check_password(gsm.hash_password('warmup'), 'warmup')
+
+    def worker(offset):
+        client = gsm.app.test_client()
+        return [login_once(client, usernames[(offset + i) % len(usernames)])
+                for i in range(requests_per_client)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = [t for batch in executor.map(worker, range(clients)) for t in batch]
+    wall = time.perf_counter() - start
+
+    print(f"pool={pool_size:<3} logins/sec={len(latencies) / wall:8.1f} "
+          f"p50={statistics.median(latencies) * 1000:7.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:7.1f}ms")
+
+
+def main():
+    load_app()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=10, help='logins per client')
+    parser.add_argument('--rounds', type=int, default=gsm.app.config['BCRYPT_LOG_ROUNDS'])
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[0, 1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    gsm.app.config['BCRYPT_LOG_ROUNDS'] = args.rounds
+    client = gsm.app.test_client()
+    usernames = [f'bench-user-{i}' for i in range(args.users)]
+    for username in usernames:
+        client.post('/api/register', json={'username': username, 'password': 'bench-pass'})
+
+    print(f"{args.clients} clients x {args.requests} logins, bcrypt rounds={args.rounds}")
+    for pool_size in args.pool_sizes:
+        run(pool_size, usernames, args.clients, args.requests)
+    gsm.configure_password_pool(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Product search benchmark.
+
+Builds a synthetic catalog in a throwaway SQLite database (the FTS5 index is
+filled by the product triggers as rows are inserted), then times a mix of
+/api/products/search queries and reports p50/p99 latency for each.
+
+    python bench_search.py --products 1000000 --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix='gsm-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+import app as gsm  # noqa: E402  (DATABASE_URL must be set before import)
+
+ADJECTIVES = ['bamboo', 'organic', 'recycled', 'reusable', 'compostable', 'solar', 'vegan',
+              'handmade', 'upcycled', 'biodegradable', 'natural', 'refillable']
+NOUNS = ['toothbrush', 'bottle', 'tote', 'jar', 'soap', 'shampoo', 'candle', 'notebook',
+         'lunchbox', 'straw', 'towel', 'backpack', 'sneaker', 'jacket', 'charger', 'lamp']
+FILLER = ['durable', 'plastic', 'free', 'zero', 'waste', 'locally', 'sourced', 'fair', 'trade',
+          'cotton', 'steel', 'glass', 'wood', 'hemp', 'certified', 'low', 'carbon', 'packaging']
+
+QUERIES = {
+    'single term': {'q': 'bottle'},
+    'two terms': {'q': 'bamboo toothbrush'},
+    'prefix': {'q': 'recy'},
+    'price filter': {'q': 'organic', 'min_price': 10, 'max_price': 40},
+    'eco filter': {'q': 'reusable tote', 'min_eco_score': 70},
+    'rare term': {'q': 'solar charger hemp'},
+}
+
+
+def build_catalog(count, chunk_size=50000):
+    rng = random.Random(42)
+    with gsm.app.app_context(), gsm.db.engine.begin() as connection:
+        for start in range(0, count, chunk_size):
+            rows = [{
+                'name': f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS)} {i}",
+                'description': ' '.join(rng.choices(FILLER + ADJECTIVES, k=12)),
+                'price': round(rng.uniform(1, 200), 2),
+                'eco_score': rng.randint(0, 100) if rng.random() > 0.1 else None,
+                'user_id': rng.randint(1, 1000),
+            } for i in range(start, min(start + chunk_size, count))]
+            connection.execute(gsm.insert(gsm.Product), rows)
+
+
+def time_query(client, params, repeat):
+    first_page, next_page = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get('/api/products/search', query_string=params)
+        first_page.append(time.perf_counter() - start)
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor:
+            start = time.perf_counter()
+            client.get('/api/products/search', query_string={**params, 'cursor': cursor})
+            next_page.append(time.perf_counter() - start)
+    return response.get_json().get('total', 0), first_page, next_page
+
+
+def p99(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build_catalog(args.products)
+    print(f"built {args.products} products + FTS index in {time.perf_counter() - start:.1f}s")
+
+    client = gsm.app.test_client()
+    for label, params in QUERIES.items():
+        total, first_page, next_page = time_query(client, params, args.repeat)
+        line = (f"{label:<13} matches={total:<8} first page (with facets) "
+                f"p50={statistics.median(first_page) * 1000:7.1f}ms p99={p99(first_page) * 1000:7.1f}ms")
+        if next_page:
+            line += (f" | next page p50={statistics.median(next_page) * 1000:7.1f}ms "
+                     f"p99={p99(next_page) * 1000:7.1f}ms")
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Concurrent-writer SQLite benchmark.
+
+Simulates several gunicorn workers (processes) with several request threads
+each, all submitting recycle items, once with the default storage setup and
+once with SQLITE_CONCURRENCY_MODE. Reports committed inserts/sec and how many
+submissions failed with "database is locked".
+
+    python bench_sqlite_writes.py --processes 4 --threads 8 --inserts 50
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_app(db_url, concurrency_mode):
+    # Configure storage before the app module creates its engine and tables
+    os.environ['DATABASE_URL'] = db_url
+    os.environ['SQLITE_CONCURRENCY_MODE'] = '1' if concurrency_mode else '0'
+    import app as gsm
+    return gsm
+
+
+def init_database(db_url, concurrency_mode):
+    load_app(db_url, concurrency_mode)
+
+
+def worker_process(db_url, concurrency_mode, threads, inserts, start_at):
+    gsm = load_app(db_url, concurrency_mode)
+    from sqlalchemy.exc import OperationalError
+
+    def submit_many(thread_index):
+        committed = locked = 0
+        with gsm.app.app_context():
+            for i in range(inserts):
+                item = gsm.RecycleItem(product_name=f'bench-{thread_index}-{i}', material='glass',
+                                       condition='good', user_id=1)
+                try:
+                    gsm.run_write(lambda: gsm.db.session.add(item))
+                    committed += 1
+                except OperationalError as exc:
+                    if 'locked' not in str(exc):
+                        raise
+                    locked += 1
+        return committed, locked
+
+    # Line up all processes so the writers actually contend
+    time.sleep(max(0, start_at - time.time()))
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(submit_many, range(threads)))
+    return sum(c for c, _ in results), sum(l for _, l in results)
+
+
+def run(concurrency_mode, args):
+    db_dir = tempfile.mkdtemp(prefix='gsm-bench-')
+    db_url = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        # Create the schema once so workers don't race on CREATE TABLE
+        pool.apply(init_database, (db_url, concurrency_mode))
+    start_at = time.time() + 3  # time for every process to import the app
+    with ctx.Pool(args.processes) as pool:
+        pending = [pool.apply_async(worker_process, (db_url, concurrency_mode, args.threads,
+                                                     args.inserts, start_at))
+                   for _ in range(args.processes)]
+        results = [p.get() for p in pending]
+    wall = time.time() - start_at
+    committed = sum(c for c, _ in results)
+    locked = sum(l for _, l in results)
+    label = 'concurrency mode' if concurrency_mode else 'default'
+    print(f"{label:<17} inserts/sec={committed / wall:8.1f} committed={committed} locked={locked}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--inserts', type=int, default=50, help='inserts per thread')
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes x {args.threads} threads x {args.inserts} inserts")
+    run(False, args)
+    run(True, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+"""bcrypt work run in the password hashing process pool.
+
+Kept apart from app.py so pool processes started with spawn/forkserver only
+import bcrypt, not the Flask app and its startup migrations.
+"""
+import bcrypt
+
+
+def hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def check_password(pw_hash, password):
+    return bcrypt.checkpw(password.encode('utf-8'), pw_hash.encode('utf-8'))
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix='gsm-test-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as gsm  # noqa: E402  (DATABASE_URL must be set before import)
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+gsm.app.config['PASSWORD_POOL_SIZE'] = 0
+gsm.app.config['BCRYPT_LOG_ROUNDS'] = 4
+# Tokens carry a dict identity
+gsm.app.config['JWT_VERIFY_SUB'] = False
+
+
+@pytest.fixture
+def app_module():
+    with gsm.app.app_context():
+        yield gsm
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def make_user(app_module):
+    created = []
+
+    def make(role='customer', eco_points=0):
+        user = app_module.User(username=f'test-user-{len(created)}-{os.urandom(4).hex()}',
+                               password='x', role=role, eco_points=eco_points)
+        app_module.db.session.add(user)
+        app_module.db.session.commit()
+        created.append(user)
+        return user
+    return make
+
+
+@pytest.fixture
+def admin_headers(app_module):
+    token = create_access_token(identity={'role': 'admin', 'username': 'test-admin'})
+    return {'Authorization': f'Bearer {token}'}
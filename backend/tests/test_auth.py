@@ -0,0 +1,11 @@
+def test_registration_in_another_worker_clears_cached_miss(app_module, monkeypatch):
+    gsm = app_module
+    monkeypatch.setitem(gsm.app.config, 'ACCOUNT_VERSION_CHECK_INTERVAL', 0)
+    key = (gsm.User.__tablename__, 'late-registrant')
+    gsm.unknown_usernames.add(key)
+    assert key in gsm.unknown_usernames
+
+    # Another worker's registration only bumps the shared counter, not this cache
+    gsm.bump_account_version()
+    gsm.db.session.commit()
+    assert key not in gsm.unknown_usernames
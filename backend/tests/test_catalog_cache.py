@@ -0,0 +1,30 @@
+def test_empty_seller_views_are_not_cached(app_module, client):
+    gsm = app_module
+    before = gsm.catalog_cache.stats()['entries']
+    for seller_id in range(10 ** 6, 10 ** 6 + 50):
+        response = client.get(f'/api/products?seller_id={seller_id}')
+        assert response.status_code == 200 and response.get_json() == []
+        assert response.headers['ETag']
+    assert gsm.catalog_cache.stats()['entries'] == before
+
+
+def test_cache_counts_entry_overhead_and_caps_entries(app_module, monkeypatch):
+    gsm = app_module
+    cache = gsm.CatalogCache()
+    monkeypatch.setitem(gsm.app.config, 'CATALOG_CACHE_MAX_BYTES', 10 * gsm.CATALOG_CACHE_ENTRY_OVERHEAD)
+    monkeypatch.setitem(gsm.app.config, 'CATALOG_CACHE_MAX_ENTRIES', 1000)
+    for key in range(100):
+        cache.put(key, 1, b'[]')
+    stats = cache.stats()
+    assert stats['entries'] == 9
+    assert stats['bytes'] <= gsm.app.config['CATALOG_CACHE_MAX_BYTES']
+
+    monkeypatch.setitem(gsm.app.config, 'CATALOG_CACHE_MAX_ENTRIES', 3)
+    cache.put('latest', 1, b'[]')
+    assert cache.stats()['entries'] == 3
+    assert cache.get('latest', 1) is not None
+
+    # A body over the whole budget is returned but not kept
+    version, etag, body = cache.put('huge', 1, b'x' * gsm.app.config['CATALOG_CACHE_MAX_BYTES'])
+    assert body and etag
+    assert cache.get('huge', 1) is None
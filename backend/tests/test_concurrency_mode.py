@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Concurrency mode is fixed when app.py is imported, so this runs in a fresh interpreter
+SCRIPT = textwrap.dedent('''
+    import json
+    from sqlalchemy import select
+    import app as gsm
+
+    gsm.app.config['GROUP_COMMIT_WINDOW_MS'] = 500
+    batch_sizes = []
+    commit_batch = gsm.group_commit_writer._commit_batch
+
+    def recording_commit_batch(batch):
+        batch_sizes.append(len(batch))
+        commit_batch(batch)
+
+    gsm.group_commit_writer._commit_batch = recording_commit_batch
+
+    def add_item(name, fail=False):
+        def job():
+            gsm.db.session.add(gsm.RecycleItem(product_name=name, material='glass',
+                                               condition='good', user_id=1))
+            gsm.db.session.flush()
+            if fail:
+                raise ValueError(name)
+            return name
+        return job
+
+    futures = [gsm.group_commit_writer.submit(add_item(name, fail=(name == 'bad')))
+               for name in ('good-1', 'bad', 'good-2')]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except ValueError as exc:
+            results.append('error:' + str(exc))
+
+    with gsm.app.app_context():
+        session = gsm.db.session
+        read_bind = session.get_bind(clause=select(gsm.RecycleItem)) is gsm._read_engine
+        names = sorted(name for (name,) in session.query(gsm.RecycleItem.product_name))
+        session.add(gsm.RecycleItem(product_name='after-write', material='glass',
+                                    condition='good', user_id=1))
+        session.flush()
+        read_after_write = session.get_bind(clause=select(gsm.RecycleItem)) is gsm._read_engine
+        session.rollback()
+
+    print(json.dumps({'batch_sizes': batch_sizes, 'results': results, 'names': names,
+                      'read_bind': read_bind, 'read_after_write': read_after_write}))
+''')
+
+
+def test_failed_job_does_not_abort_its_group_commit_batch(tmp_path):
+    env = dict(os.environ, SQLITE_CONCURRENCY_MODE='1',
+               DATABASE_URL=f"sqlite:///{tmp_path / 'concurrency.db'}")
+    completed = subprocess.run([sys.executable, '-c', SCRIPT], cwd=BACKEND_DIR, env=env,
+                               capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    outcome = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert outcome['batch_sizes'] == [3]
+    assert outcome['results'] == ['good-1', 'error:bad', 'good-2']
+    assert outcome['names'] == ['good-1', 'good-2']
+    # Plain SELECTs use the read pool until the transaction writes
+    assert outcome['read_bind'] is True
+    assert outcome['read_after_write'] is False
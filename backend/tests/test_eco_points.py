@@ -0,0 +1,72 @@
+import random
+
+from sqlalchemy import select
+
+
+def db_top(gsm, limit):
+    rows = gsm.db.session.execute(
+        select(gsm.User.id, gsm.User.eco_points).where(gsm.User.eco_points > 0)
+        .order_by(gsm.User.eco_points.desc(), gsm.User.id).limit(limit)).all()
+    return [(user_id, points) for user_id, points in rows]
+
+
+def test_leaderboard_matches_db_after_random_credits_and_redemptions(app_module, make_user, monkeypatch):
+    gsm = app_module
+    monkeypatch.setitem(gsm.app.config, 'LEADERBOARD_SIZE', 5)
+    monkeypatch.setitem(gsm.app.config, 'LEADERBOARD_REFRESH_INTERVAL', 10 ** 9)
+    users = [make_user() for _ in range(40)]
+    balances = {user.id: 0 for user in users}
+    gsm.leaderboard.invalidate()
+    gsm.leaderboard.top(5)
+
+    rng = random.Random(7)
+    for _ in range(600):
+        user_id = rng.choice(list(balances))
+        if balances[user_id] >= gsm.REDEMPTION_COST and rng.random() < 0.4:
+            delta, reason = -gsm.REDEMPTION_COST, 'redemption'
+        else:
+            delta, reason = rng.randint(1, 60), 'recycle_approval'
+        balances[user_id] += delta
+        gsm.credit_eco_points([(user_id, delta, reason, None)])
+        gsm.db.session.commit()
+
+        expected = db_top(gsm, 5)
+        assert [(user_id, points) for user_id, _, points in gsm.leaderboard.top(5)] == expected
+
+
+def test_reconcile_fixes_drift(app_module, make_user):
+    gsm = app_module
+    user = make_user()
+    gsm.credit_eco_points([(user.id, 30, 'recycle_approval', None)])
+    gsm.db.session.commit()
+    gsm.db.session.execute(gsm.update(gsm.User).where(gsm.User.id == user.id).values(eco_points=999))
+    gsm.db.session.commit()
+
+    assert (user.id, 999, 30) in gsm.reconcile_eco_points()
+    gsm.db.session.expire_all()
+    assert gsm.db.session.get(gsm.User, user.id).eco_points == 30
+
+
+def test_reconcile_keeps_a_credit_made_after_the_scan(app_module, make_user, monkeypatch):
+    gsm = app_module
+    user = make_user()
+    gsm.db.session.execute(gsm.update(gsm.User).where(gsm.User.id == user.id).values(eco_points=5))
+    gsm.db.session.commit()
+
+    execute = gsm.db.session.execute
+    credited = []
+
+    def execute_with_concurrent_credit(statement, params=None, **kwargs):
+        # The fix pass is the only executemany; a credit commits just before it
+        if isinstance(params, list) and not credited:
+            credited.append(True)
+            gsm.credit_eco_points([(user.id, 10, 'recycle_approval', None)])
+        return execute(statement, params, **kwargs)
+
+    monkeypatch.setattr(gsm.db.session, 'execute', execute_with_concurrent_credit)
+    assert (user.id, 5, 0) in gsm.reconcile_eco_points()
+    monkeypatch.undo()
+
+    assert credited
+    gsm.db.session.expire_all()
+    assert gsm.db.session.get(gsm.User, user.id).eco_points == 15
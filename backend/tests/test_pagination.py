@@ -0,0 +1,50 @@
+from sqlalchemy import text
+
+
+def collect_ids(gsm, query, order_columns, limit=1):
+    seen, cursor = [], None
+    while True:
+        url = f'/?limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        with gsm.app.test_request_context(url):
+            response, status = gsm.paginated_response(query, order_columns, lambda item: item.id)
+        assert status == 200, response.get_json()
+        seen.extend(response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return seen
+
+
+def test_keyset_paging_includes_legacy_timestamps(app_module):
+    gsm = app_module
+    # Rows as written by the old CURRENT_TIMESTAMP default: no fractional seconds
+    with gsm.db.engine.begin() as connection:
+        for name in ('legacy-a', 'legacy-b', 'legacy-c'):
+            connection.execute(text(
+                "INSERT INTO recycle_item (product_name, material, condition, status, user_id, "
+                "date_submitted) VALUES (:name, 'glass', 'good', 'pending', 1, '2024-01-01 10:00:00')"),
+                {'name': name})
+    with gsm.db.engine.begin() as connection:
+        gsm.normalize_recycle_dates(connection)
+
+    query = gsm.RecycleItem.query.filter(gsm.RecycleItem.product_name.like('legacy-%'))
+    order_columns = [gsm.RecycleItem.date_submitted, gsm.RecycleItem.id]
+    ids = collect_ids(gsm, query, order_columns)
+
+    expected = [item.id for item in query.order_by(gsm.RecycleItem.id)]
+    assert len(expected) == 3
+    assert sorted(ids) == expected
+
+
+def test_malformed_cursor_values_are_rejected(app_module):
+    gsm = app_module
+    query = gsm.RecycleItem.query
+    order_columns = [gsm.RecycleItem.date_submitted, gsm.RecycleItem.id]
+    for values in ([{}, 1], ['2024-01-01T10:00:00', 'x'], ['2024-01-01T10:00:00', True],
+                   [5, 1], {'a': 1, 'b': 2}):
+        cursor = gsm.base64.urlsafe_b64encode(gsm.json.dumps(values).encode()).decode()
+        with gsm.app.test_request_context(f'/?cursor={cursor}'):
+            response, status = gsm.paginated_response(query, order_columns, lambda item: item.id)
+        assert status == 400, values
+
+    assert gsm.decode_cursor(gsm.encode_cursor([1.5, 3]), gsm.SEARCH_CURSOR_COLUMNS) == [1.5, 3]
+    assert gsm.decode_cursor(gsm.encode_cursor([{}, 3]), gsm.SEARCH_CURSOR_COLUMNS) is None
@@ -0,0 +1,30 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture
+def seller_headers(app_module, make_user):
+    seller = make_user(role='seller')
+    token = create_access_token(identity={'id': seller.id, 'role': 'seller', 'username': seller.username})
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.mark.parametrize('eco_score', [5000, -7, 101, True, 'high', [50]])
+def test_out_of_range_eco_score_is_rejected(client, seller_headers, eco_score):
+    response = client.post('/api/products', headers=seller_headers, json={
+        'name': 'Jar', 'description': 'glass jar', 'price': 5, 'eco_score': eco_score})
+    assert response.status_code == 400
+
+
+def test_client_score_is_ignored_when_attributes_are_sent(app_module, client, seller_headers):
+    gsm = app_module
+    attributes = {'material': 'recycled glass', 'end_of_life': 'recyclable'}
+    response = client.post('/api/products', headers=seller_headers, json={
+        'name': 'Jar', 'description': 'glass jar', 'price': 5, 'eco_score': 100, **attributes})
+    assert response.status_code == 201
+    expected = gsm.eco_score_engine.score_one(gsm.product_attributes(attributes))
+    assert response.get_json()['eco_score'] == expected != 100
+
+    product_id = response.get_json()['id']
+    response = client.put(f'/api/products/{product_id}', headers=seller_headers, json={'eco_score': 42})
+    assert response.get_json()['eco_score'] == 42
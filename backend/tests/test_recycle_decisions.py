@@ -0,0 +1,69 @@
+def submit_items(gsm, user, count):
+    items = [gsm.RecycleItem(product_name=f'item-{i}', material='glass', condition='good',
+                             user_id=user.id) for i in range(count)]
+    gsm.db.session.add_all(items)
+    gsm.db.session.commit()
+    return [item.id for item in items]
+
+
+def test_bulk_decisions_report_one_outcome_per_item(app_module, client, make_user, admin_headers):
+    gsm = app_module
+    user = make_user()
+    approve_id, reject_id, processed_id = submit_items(gsm, user, 3)
+    gsm.db.session.get(gsm.RecycleItem, processed_id).status = 'Approved'
+    gsm.db.session.commit()
+
+    decisions = [
+        {'id': approve_id, 'status': 'Approved'},
+        {'id': reject_id, 'status': 'Rejected'},
+        {'id': approve_id, 'status': 'Approved'},
+        {'id': processed_id, 'status': 'Approved'},
+        {'id': 10 ** 9, 'status': 'Approved'},
+        {'id': 'x', 'status': 'Approved'},
+        {'id': True, 'status': 'Approved'},
+        {'id': reject_id + 10 ** 9, 'status': ['Approved']},
+        {'id': reject_id + 10 ** 9, 'status': 'Maybe'},
+        'not a decision',
+    ]
+    response = client.post('/api/admin/recycle_items/bulk', headers=admin_headers,
+                           json={'decisions': decisions})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [result['outcome'] for result in body['results']] == [
+        'approved', 'rejected', 'duplicate', 'already_processed', 'not_found',
+        'invalid_id', 'invalid_id', 'invalid_status', 'invalid_status', 'invalid_id',
+    ]
+    assert body['summary'] == {'approved': 1, 'rejected': 1, 'duplicate': 1, 'already_processed': 1,
+                               'not_found': 1, 'invalid_id': 3, 'invalid_status': 2}
+
+    gsm.db.session.expire_all()
+    assert gsm.db.session.get(gsm.RecycleItem, approve_id).status == 'Approved'
+    assert gsm.db.session.get(gsm.RecycleItem, reject_id).status == 'Rejected'
+
+
+def test_each_approval_issues_one_voucher_and_one_credit(app_module, client, make_user, admin_headers):
+    gsm = app_module
+    user = make_user()
+    item_ids = submit_items(gsm, user, 2)
+
+    # Approving twice (in bulk and then one by one) must not issue anything extra
+    client.post('/api/admin/recycle_items/bulk', headers=admin_headers,
+                json={'decisions': [{'id': item_id, 'status': 'Approved'} for item_id in item_ids]})
+    response = client.put(f'/api/admin/recycle_item/{item_ids[0]}', headers=admin_headers,
+                          json={'status': 'Approved'})
+    assert response.status_code == 409
+
+    gsm.db.session.expire_all()
+    assert gsm.Voucher.query.filter_by(user_id=user.id).count() == 2
+    credits = gsm.EcoPointsLedger.query.filter_by(user_id=user.id, reason='recycle_approval').all()
+    assert sorted(entry.reference_id for entry in credits) == sorted(item_ids)
+    assert all(entry.delta == gsm.ECO_POINTS_PER_APPROVAL for entry in credits)
+    assert gsm.db.session.get(gsm.User, user.id).eco_points == 2 * gsm.ECO_POINTS_PER_APPROVAL
+
+
+def test_single_decision_rejects_non_string_status(app_module, client, make_user, admin_headers):
+    gsm = app_module
+    (item_id,) = submit_items(gsm, make_user(), 1)
+    response = client.put(f'/api/admin/recycle_item/{item_id}', headers=admin_headers,
+                          json={'status': {'Approved': True}})
+    assert response.status_code == 400
@@ -0,0 +1,27 @@
+def test_streamed_export_is_recorded_once_with_its_queries(app_module, client, make_user, admin_headers):
+    gsm = app_module
+    user = make_user()
+    gsm.db.session.add_all([gsm.RecycleItem(product_name=f'export-{i}', material='glass', condition='good',
+                                            user_id=user.id) for i in range(3)])
+    gsm.db.session.commit()
+    route = 'GET /api/admin/recycle_items'
+    with gsm.route_metrics_lock:
+        gsm.route_metrics.pop(route, None)
+
+    response = client.get('/api/admin/recycle_items?format=ndjson', headers=admin_headers)
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(response.get_data().splitlines()) >= 3
+    response.close()
+
+    snapshot = client.get('/api/admin/metrics', headers=admin_headers).get_json()['routes'][route]
+    assert snapshot['requests'] == 1
+    assert snapshot['db_queries_per_request'] >= 1
+
+
+def test_plain_request_is_recorded_once(app_module, client):
+    gsm = app_module
+    route = 'GET /api/leaderboard'
+    with gsm.route_metrics_lock:
+        gsm.route_metrics.pop(route, None)
+    client.get('/api/leaderboard')
+    assert gsm.route_metrics[route].requests == 1
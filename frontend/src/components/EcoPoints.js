@@ -1,4 +1,5 @@
 import React, { useEffect, useState } from 'react';
+import fetchAllPages from '../fetchAllPages';
 
 const EcoPoints = () => {
   const [ecoPoints, setEcoPoints] = useState(0);
@@ -26,7 +27,7 @@ const EcoPoints = () => {
       setEcoPoints(ecoPointsData.points); // Set eco points
 
       // Fetch vouchers
-      const vouchersResponse = await fetch('http://127.0.0.1:5000/api/vouchers', {
+      const vouchersResult = await fetchAllPages('http://127.0.0.1:5000/api/vouchers', {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -34,12 +35,11 @@ const EcoPoints = () => {
         },
       });
 
-      if (!vouchersResponse.ok) {
+      if (!vouchersResult.ok) {
         throw new Error('Failed to fetch vouchers');
       }
 
-      const vouchersData = await vouchersResponse.json();
-      setVouchers(vouchersData); // Set vouchers data
+      setVouchers(vouchersResult.items); // Set vouchers data
 
     } catch (error) {
       setError(error.message); // Handle any errors
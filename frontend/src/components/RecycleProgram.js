@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import fetchAllPages from '../fetchAllPages';
 
 const RecycleProgram = () => {
   const [productName, setProductName] = useState('');
@@ -49,7 +50,7 @@ const RecycleProgram = () => {
     const token = localStorage.getItem('token'); // Get the user's token
 
     try {
-      const response = await fetch('http://127.0.0.1:5000/api/recycle_items', {
+      const { ok, items } = await fetchAllPages('http://127.0.0.1:5000/api/recycle_items', {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -57,12 +58,11 @@ const RecycleProgram = () => {
         }
       });
 
-      if (!response.ok) {
+      if (!ok) {
         throw new Error('Failed to fetch submitted items');
       }
 
-      const data = await response.json();
-      setSubmittedItems(data);
+      setSubmittedItems(items);
     } catch (err) {
       setError(err.message);
     }
@@ -1,4 +1,5 @@
 import React, { useEffect, useState } from 'react';
+import fetchAllPages from '../../fetchAllPages';
 
 const AdminDashboard = () => {
   const [recycleItems, setRecycleItems] = useState([]);
@@ -10,16 +11,15 @@ const AdminDashboard = () => {
   const fetchRecycleItems = async () => {
     try {
       const token = localStorage.getItem('token');
-      const response = await fetch('http://127.0.0.1:5000/api/admin/recycle_items', {
+      const { ok, items } = await fetchAllPages('http://127.0.0.1:5000/api/admin/recycle_items', {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
         },
       });
-      if (!response.ok) throw new Error('Failed to fetch recycle items');
-      const data = await response.json();
-      setRecycleItems(data);
+      if (!ok) throw new Error('Failed to fetch recycle items');
+      setRecycleItems(items);
     } catch (err) {
       setError(err.message);
     }
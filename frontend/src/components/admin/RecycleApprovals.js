@@ -1,4 +1,5 @@
 import React, { useEffect, useState } from 'react';
+import fetchAllPages from '../../fetchAllPages';
 
 const RecycleApprovals = () => {
   const [pendingItems, setPendingItems] = useState([]);
@@ -8,7 +9,7 @@ const RecycleApprovals = () => {
   const fetchPendingItems = async () => {
     try {
       const token = localStorage.getItem('token'); // Get admin token
-      const response = await fetch('http://127.0.0.1:5000/api/admin/recycle_items', {
+      const { ok, items } = await fetchAllPages('http://127.0.0.1:5000/api/admin/recycle_items', {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -16,12 +17,11 @@ const RecycleApprovals = () => {
         }
       });
       
-      if (!response.ok) {
+      if (!ok) {
         throw new Error('Failed to fetch pending items');
       }
       
-      const data = await response.json();
-      setPendingItems(data);
+      setPendingItems(items);
     } catch (err) {
       setError(err.message);
     }
@@ -0,0 +1,18 @@
+// List endpoints return one page at a time and put the cursor for the next
+// page in the X-Next-Cursor header; keep fetching until it is absent.
+const fetchAllPages = async (url, options) => {
+  let items = [];
+  let cursor = null;
+  do {
+    const pageUrl = cursor ? `${url}?cursor=${encodeURIComponent(cursor)}` : url;
+    const response = await fetch(pageUrl, options);
+    if (!response.ok) {
+      return { ok: false, items };
+    }
+    items = items.concat(await response.json());
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return { ok: true, items };
+};
+
+export default fetchAllPages;